@@ -8,6 +8,11 @@
  *   3. Open-Meteo         — weather
  *   4. Nominatim OSM      — reverse geocoding
  *
+ * v17 — 2026-10-17
+ *   Price polling reads data/prices.delta.json (changed quotes only, tagged
+ *   with seq/base) after the first full load of prices.json, and patches the
+ *   quotes it holds. A missed seq falls back to the full file.
+ *
  * v16 — 2026-04-28
  *   FIX: Stale localStorage cache made the site stick to whatever location
  *   was first detected (e.g. office) even after the user had physically
@@ -692,6 +697,18 @@ function applyPriceResult(key, q, close, open, netChg, pctChg) {
 // ─────────────────────────────────────────────────────────────────
 // PRIMARY PRICE SOURCE — data/prices.json
 // ─────────────────────────────────────────────────────────────────
+// v17: after the first full load, polls read the small delta feed and
+// only touch the quotes that changed. _priceSeq is the seq we hold.
+var _priceSeq = null;
+
+function applyQuotes(quotes) {
+  Object.keys(quotes).forEach(function(key) {
+    var q = quotes[key];
+    if (!q || q.close === null || q.close === undefined) return;
+    applyPriceResult(key, q, q.close, q.open, q.netChange, q.pctChange);
+  });
+}
+
 function fetchAllPrices() {
   fetch('/data/prices.json', { cache: 'no-store' })
     .then(function(r) {
@@ -699,16 +716,28 @@ function fetchAllPrices() {
       return r.json();
     })
     .then(function(data) {
-      var quotes = data.quotes || {};
-      Object.keys(quotes).forEach(function(key) {
-        var q = quotes[key];
-        if (!q || q.close === null || q.close === undefined) return;
-        applyPriceResult(key, q, q.close, q.open, q.netChange, q.pctChange);
-      });
+      _priceSeq = (typeof data.seq === 'number') ? data.seq : null;
+      applyQuotes(data.quotes || {});
     })
     .catch(function(e) { console.warn('prices.json fetch failed:', e); });
 }
 
+function pollPrices() {
+  if (_priceSeq === null) { fetchAllPrices(); return; }
+  fetch('/data/prices.delta.json', { cache: 'no-store' })
+    .then(function(r) {
+      if (!r.ok) throw new Error('prices.delta.json ' + r.status);
+      return r.json();
+    })
+    .then(function(delta) {
+      if (delta.seq === _priceSeq) return;
+      if (delta.base !== _priceSeq) { fetchAllPrices(); return; }
+      _priceSeq = delta.seq;
+      applyQuotes(delta.quotes || {});
+    })
+    .catch(function() { fetchAllPrices(); });
+}
+
 // ─────────────────────────────────────────────────────────────────
 // FFAI INDEX
 // ─────────────────────────────────────────────────────────────────
@@ -1133,7 +1162,7 @@ function loadDailyBriefing() {
     }
 
     setInterval(function() {
-      fetchAllPrices();
+      pollPrices();
       fetchFFAILive();
     }, 5 * 60 * 1000);
 
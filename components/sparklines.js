@@ -21,6 +21,13 @@
  * visual direction (up/down) and range context without needing
  * historical arrays.
  *
+ * v2 — 2026-10-17
+ *   When /data/prices-intraday.json is available (written by
+ *   fetch_prices.py every run: shared `t` array + one price array per
+ *   symbol, last 48 half-hourly prints) the card draws the real
+ *   intraday line instead of the 3-point sketch. Falls back to v1
+ *   drawing when the file is missing or a symbol has < 3 prints.
+ *
  * v1 — 2026-04-13
  */
 
@@ -109,6 +116,51 @@
     ctx.stroke();
   }
 
+  // ── Draw a real intraday line (v2) ──────────────────────────────────
+  function drawSeries(canvas, values, isUp) {
+    var W = canvas.width  || canvas.offsetWidth  || 120;
+    var H = canvas.height || canvas.offsetHeight ||  36;
+    canvas.width  = W;
+    canvas.height = H;
+
+    var ctx = canvas.getContext('2d');
+    ctx.clearRect(0, 0, W, H);
+
+    var lo = Math.min.apply(null, values), hi = Math.max.apply(null, values);
+    var range = hi - lo || 1;
+    var clr = isUp ? CLR_UP : CLR_DN;
+    function yOf(v) { return H - ((v - lo) / range) * (H * 0.82) - H * 0.09; }
+    var step = values.length > 1 ? W / (values.length - 1) : W;
+
+    ctx.beginPath();
+    values.forEach(function (v, i) {
+      if (i === 0) ctx.moveTo(0, yOf(v)); else ctx.lineTo(i * step, yOf(v));
+    });
+    ctx.strokeStyle = clr + '0.9)';
+    ctx.lineWidth   = 1.6;
+    ctx.lineJoin    = 'round';
+    ctx.lineCap     = 'round';
+    ctx.stroke();
+
+    var grad = ctx.createLinearGradient(0, 0, 0, H);
+    grad.addColorStop(0,   clr + '0.18)');
+    grad.addColorStop(1,   clr + '0.00)');
+    ctx.lineTo(W, H);
+    ctx.lineTo(0, H);
+    ctx.closePath();
+    ctx.fillStyle = grad;
+    ctx.fill();
+  }
+
+  // Intraday arrays keyed by symbol, nulls (missed runs) dropped.
+  function intradayFor(sym) {
+    var d = window.AGSIST_INTRADAY;
+    var arr = d && d.series && d.series[sym];
+    if (!arr) return null;
+    var vals = arr.filter(function (v) { return v != null; });
+    return vals.length >= 3 ? vals : null;
+  }
+
   // ── Wire one .pc-spark element ────────────────────────────────────
   function wireElement(el, quotes) {
     var sym = el.getAttribute('data-spark');
@@ -147,7 +199,9 @@
     var isUp = (q.netChange != null) ? q.netChange >= 0 : (close >= open);
 
     try {
-      drawSparkline(canvas, lo52, hi52, open, close, isUp);
+      var series = intradayFor(sym);
+      if (series) drawSeries(canvas, series, isUp);
+      else drawSparkline(canvas, lo52, hi52, open, close, isUp);
       el.classList.add('loaded');
     } catch (e) {
       // Canvas draw failed silently — don't show empty div
@@ -200,7 +254,18 @@
   window.AGSIST_SPARKLINE = drawSparkline;
 
   // ── Boot: run after DOM ready ─────────────────────────────────────
+  function loadIntraday() {
+    return fetch('/data/prices-intraday.json', { cache: 'no-store' })
+      .then(function (r) { return r.ok ? r.json() : null; })
+      .then(function (d) { if (d) window.AGSIST_INTRADAY = d; })
+      .catch(function () { /* optional — v1 drawing still works */ });
+  }
+
   function boot() {
+    loadIntraday().then(bootPrices);
+  }
+
+  function bootPrices() {
     // Try immediately if data is already loaded (set by index.html or geo.js)
     if (!tryFromGlobal()) {
       // Primary fallback: fetch prices.json directly
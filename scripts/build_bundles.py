@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+build_bundles.py — per-commodity data bundles for the futures pages
+Writes:
+  data/bundles/corn.json
+  data/bundles/soybeans.json
+  data/bundles/wheat.json
+
+Each futures page used to make five no-store requests on load
+(prices.json, daily.json, crop-progress.json, cot.json, bids.json) and
+throw most of every payload away. A bundle carries only what that page
+reads, in the same shapes as the source files, so the page's existing
+renderers take it unchanged:
+
+  prices         fetched/seq, the page's quotes (its headline symbols and
+                 every contract on its curve), its derived metrics and
+                 its curves entry
+  cot            report_date/updated and the commodity's COT row
+  crop_progress  updated/in_season and the commodity's condition row
+                 (absent for wheat — the page has no crop card)
+  bids           fetched, the ZIP grid and only this commodity's bids
+  daily          the briefing strip fields (date, headline, teaser, ...)
+
+Runs from .github/workflows/bundles.yml whenever one of the source
+fetchers finishes. A bundle is only rewritten when its content changes.
+Stdlib only; a missing source file just leaves its section out, and the
+pages fall back to fetching that file directly.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+DATA_DIR   = "data"
+BUNDLE_DIR = "data/bundles"
+
+SOURCES = {
+    "prices":        "prices.json",
+    "cot":           "cot.json",
+    "crop_progress": "crop-progress.json",
+    "bids":          "bids.json",
+    "daily":         "daily.json",
+}
+
+# page bundle → keys into the source files, and the quotes / derived
+# metrics the page reads. Curve contracts ("<crop_key>-*") are added on top.
+BUNDLES = {
+    "corn": {
+        "crop_key": "corn", "progress_key": "corn",
+        "quotes":  ("corn", "corn-dec", "beans", "beans-nov", "wheat", "crude", "dollar"),
+        "derived": ("corn_bean_ratio",),
+    },
+    "soybeans": {
+        "crop_key": "beans", "progress_key": "soybeans",
+        "quotes":  ("beans", "beans-nov", "corn", "corn-dec", "meal", "soyoil", "dollar"),
+        "derived": ("corn_bean_ratio", "board_crush", "oil_share"),
+    },
+    "wheat": {
+        "crop_key": "wheat", "progress_key": None,
+        "quotes":  ("wheat", "corn", "corn-dec", "beans", "oats", "crude", "dollar"),
+        "derived": (),
+    },
+}
+
+DAILY_FIELDS = ("date", "headline", "subheadline", "lead", "teaser")
+
+
+def load(name):
+    try:
+        with open(os.path.join(DATA_DIR, name)) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"  [skip] {name}: {e}")
+        return None
+
+
+def bid_crop(bid):
+    """Same mapping as normalizeCommodity() on the futures pages."""
+    n = str(bid.get("commodity") or bid.get("commodityName") or bid.get("crop") or "").lower().strip()
+    if "corn" in n:
+        return "corn"
+    if "soy" in n or n == "beans":
+        return "beans"
+    if "wheat" in n:
+        return "wheat"
+    return None
+
+
+def build(spec, src):
+    crop = spec["crop_key"]
+    bundle = {}
+
+    prices = src.get("prices")
+    if prices:
+        quotes = prices.get("quotes", {})
+        keys = list(spec["quotes"]) + sorted(k for k in quotes if k.startswith(crop + "-"))
+        derived = prices.get("derived", {})
+        curves = prices.get("curves", {})
+        bundle["prices"] = {
+            "fetched": prices.get("fetched"),
+            "seq":     prices.get("seq"),
+            "quotes":  {k: quotes[k] for k in dict.fromkeys(keys) if k in quotes},
+            "derived": {k: derived[k] for k in spec["derived"] if k in derived},
+            "curves":  {crop: curves[crop]} if crop in curves else {},
+        }
+
+    cot = src.get("cot")
+    if cot and crop in cot:
+        bundle["cot"] = {"updated": cot.get("updated"), "report_date": cot.get("report_date"),
+                         crop: cot[crop]}
+
+    progress = src.get("crop_progress")
+    pk = spec["progress_key"]
+    if progress and pk and pk in progress:
+        bundle["crop_progress"] = {"updated": progress.get("updated"),
+                                   "report_date": progress.get("report_date"),
+                                   "in_season": progress.get("in_season"),
+                                   pk: progress[pk]}
+
+    bids = src.get("bids")
+    if bids:
+        bundle["bids"] = {"fetched": bids.get("fetched"), "source": bids.get("source"),
+                          "zip_grid": bids.get("zip_grid", []),
+                          "bids": [b for b in bids.get("bids", []) if bid_crop(b) == crop]}
+
+    daily = src.get("daily")
+    if daily:
+        bundle["daily"] = {k: daily.get(k) for k in DAILY_FIELDS if k in daily}
+
+    return bundle
+
+
+def main():
+    print(f"\nAGSIST build_bundles.py — {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")
+    src = {part: load(name) for part, name in SOURCES.items()}
+    if not any(src.values()):
+        print("ERROR: no source files readable", file=sys.stderr)
+        sys.exit(1)
+
+    os.makedirs(BUNDLE_DIR, exist_ok=True)
+    for name, spec in BUNDLES.items():
+        bundle = build(spec, src)
+        path = os.path.join(BUNDLE_DIR, f"{name}.json")
+        try:
+            with open(path) as f:
+                old = json.load(f)
+        except Exception:
+            old = None
+        if old is not None and {k: v for k, v in old.items() if k != "built"} == bundle:
+            print(f"  {name:9s} unchanged")
+            continue
+        out = {"built": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"), **bundle}
+        with open(path, "w") as f:
+            json.dump(out, f, separators=(",", ":"), allow_nan=False)
+        print(f"  {name:9s} {os.path.getsize(path):>7,} bytes  ({', '.join(bundle)}) → {path}")
+
+
+if __name__ == "__main__":
+    main()
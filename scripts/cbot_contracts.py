@@ -0,0 +1,187 @@
+"""
+AGSIST CBOT grain contract calendar.
+
+Builds the live corn / soybean / wheat forward curve from the exchange
+month codes and the CBOT expiry rule, so fetch_prices.py never asks
+Yahoo for a contract that has already gone off the board and nobody has
+to hand-edit year suffixes every January.
+
+  Corn, wheat:  Mar (H), May (K), Jul (N), Sep (U), Dec (Z)
+  Soybeans:     Jan (F), Mar (H), May (K), Jul (N), Aug (Q), Sep (U), Nov (X)
+
+Last trading day for all three is the business day before the 15th of
+the contract month. Exchange holidays are not modelled; a contract that
+expires on a holiday-shifted day is pruned at most one day late.
+
+Keys keep the v3 naming ("corn-mar27", "beans-nov27") so the futures
+pages and prices.json consumers see the same shape as before.
+
+The new-crop benchmark aliases roll together: "corn-dec" and
+"beans-nov" always point at the same crop year, the first one in which
+every aliased contract still has more than ALIAS_ROLL_DAYS of life left.
+So both roll in mid-October, when November beans reach their roll date,
+and the corn/bean ratio never compares one crop year with the next.
+(From then until mid-November the old December corn is still on the
+curve as "corn-dec<yy>".)
+
+An alias key is only a pointer: its price history and rolling stats are
+kept under the dated contract's key (alias_history_keys()), so a roll
+switches the alias to the next contract's own series instead of
+appending next year's prices to this year's.
+"""
+
+from collections import namedtuple
+from datetime import date, timedelta
+
+MONTH_CODES = {
+    "F": 1, "G": 2, "H": 3, "J": 4, "K": 5, "M": 6,
+    "N": 7, "Q": 8, "U": 9, "V": 10, "X": 11, "Z": 12,
+}
+CODE_FOR_MONTH = {m: c for c, m in MONTH_CODES.items()}
+MONTH_ABBR = ["jan", "feb", "mar", "apr", "may", "jun",
+              "jul", "aug", "sep", "oct", "nov", "dec"]
+
+# commodity → Yahoo root, listed months, and the new-crop alias
+# (key, month code) if the pages use one.
+COMMODITIES = {
+    "corn":  {"root": "ZC", "months": "HKNUZ",   "alias": ("corn-dec", "Z")},
+    "beans": {"root": "ZS", "months": "FHKNQUX", "alias": ("beans-nov", "X")},
+    "wheat": {"root": "ZW", "months": "HKNUZ",   "alias": None},
+}
+
+# How far out the curve runs. 20 months always reaches next year's
+# new-crop contract, which is where the hand-kept v3 curve stopped.
+CURVE_HORIZON_MONTHS = 20
+
+# An alias moves to next year's contract once the current one has this
+# many days or fewer to expiry — liquidity has migrated by then.
+ALIAS_ROLL_DAYS = 30
+
+Contract = namedtuple("Contract", "commodity key ticker year month expiry")
+
+
+def last_trade_date(year, month):
+    """Business day before the 15th of the contract month."""
+    d = date(year, month, 15) - timedelta(days=1)
+    while d.weekday() >= 5:
+        d -= timedelta(days=1)
+    return d
+
+
+def make_contract(commodity, year, month):
+    spec = COMMODITIES[commodity]
+    yy = year % 100
+    return Contract(
+        commodity=commodity,
+        key=f"{commodity}-{MONTH_ABBR[month - 1]}{yy:02d}",
+        ticker=f"{spec['root']}{CODE_FOR_MONTH[month]}{yy:02d}.CBT",
+        year=year,
+        month=month,
+        expiry=last_trade_date(year, month),
+    )
+
+
+def live_contracts(commodity, today=None):
+    """Yield unexpired contracts for a commodity, nearest first (endless)."""
+    today = today or date.today()
+    months = sorted(MONTH_CODES[c] for c in COMMODITIES[commodity]["months"])
+    year = today.year
+    while True:
+        for m in months:
+            c = make_contract(commodity, year, m)
+            if c.expiry >= today:
+                yield c
+        year += 1
+
+
+def new_crop_year(today=None):
+    """
+    The crop year every new-crop alias points at: the first year in which
+    all aliased contracts have more than ALIAS_ROLL_DAYS to expiry.
+    """
+    today = today or date.today()
+    for year in (today.year, today.year + 1):
+        if all((make_contract(k, year, MONTH_CODES[s["alias"][1]]).expiry - today).days > ALIAS_ROLL_DAYS
+               for k, s in COMMODITIES.items() if s["alias"]):
+            return year
+    return today.year + 2   # unreachable with the listed alias months
+
+
+def new_crop(commodity, today=None):
+    """The contract the commodity's new-crop alias should point at, or None."""
+    spec = COMMODITIES[commodity]
+    if not spec["alias"]:
+        return None
+    return make_contract(commodity, new_crop_year(today), MONTH_CODES[spec["alias"][1]])
+
+
+def alias_history_keys(today=None):
+    """{alias key: dated key of the contract it points at}, e.g. corn-dec → corn-dec27."""
+    return {spec["alias"][0]: new_crop(commodity, today).key
+            for commodity, spec in COMMODITIES.items() if spec["alias"]}
+
+
+def check_aliases(start, days):
+    """
+    Walk `days` calendar days from `start` and return the first date on
+    which the new-crop aliases disagree on crop year or point at an
+    expired contract (None when they never do).
+    """
+    for i in range(days):
+        today = start + timedelta(days=i)
+        contracts = [new_crop(k, today) for k, s in COMMODITIES.items() if s["alias"]]
+        if len({c.year for c in contracts}) != 1 or any(c.expiry < today for c in contracts):
+            return today
+    return None
+
+
+def curve(commodity, today=None, include_alias=False):
+    """Live contracts expiring within CURVE_HORIZON_MONTHS, nearest first.
+
+    By default the contract the new-crop alias already covers is skipped
+    so the fetcher doesn't pull it twice under two keys.
+    """
+    today = today or date.today()
+    alias = None if include_alias else new_crop(commodity, today)
+    end_index = today.year * 12 + today.month - 1 + CURVE_HORIZON_MONTHS
+    out = []
+    for c in live_contracts(commodity, today):
+        if c.year * 12 + c.month - 1 > end_index:
+            break
+        if alias and c.ticker == alias.ticker:
+            continue
+        out.append(c)
+    return out
+
+
+def active_symbols(today=None):
+    """{key: yahoo_ticker} for every alias and curve contract live today."""
+    today = today or date.today()
+    symbols = {}
+    for commodity, spec in COMMODITIES.items():
+        alias = new_crop(commodity, today)
+        if alias:
+            symbols[spec["alias"][0]] = alias.ticker
+        for c in curve(commodity, today):
+            symbols[c.key] = c.ticker
+    return symbols
+
+
+def parse_ticker(ticker):
+    """"ZCZ26.CBT" → (commodity, year, month), or None for non-grain tickers."""
+    if not ticker or not ticker.endswith(".CBT") or len(ticker) < 9:
+        return None
+    root, code, yy = ticker[:2], ticker[2], ticker[3:5]
+    commodity = next((k for k, s in COMMODITIES.items() if s["root"] == root), None)
+    if commodity is None or code not in MONTH_CODES or not yy.isdigit():
+        return None
+    return commodity, 2000 + int(yy), MONTH_CODES[code]
+
+
+def contract_label(ticker):
+    """"ZCZ26.CBT" → "Dec '26" (None if the ticker isn't a dated contract)."""
+    parsed = parse_ticker(ticker)
+    if not parsed:
+        return None
+    _, year, month = parsed
+    return f"{MONTH_ABBR[month - 1].title()} '{year % 100:02d}"
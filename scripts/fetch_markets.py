@@ -1,7 +1,99 @@
 #!/usr/bin/env python3
 """
-AGSIST fetch_markets.py  v10
+AGSIST fetch_markets.py  v11
 ════════════════════════════
+v11 changes (2026-10-17):
+
+  SINGLE-PASS KEYWORD MATCHING — v10 ran one regex or substring test per
+  keyword per market: up to four sweeps of the tier lists in
+  score_relevance(), then the blacklists, categories and WHY_MAP again
+  in is_junk(), get_category() and get_why(). v11 compiles every list
+  into one Aho-Corasick automaton at import; a title is scanned once
+  (memoized, since the same text is scored, categorized and explained)
+  and every tier / blacklist / category / why hit comes out of that
+  scan. Tier-1 keeps its whole-word boundaries, everything else stays a
+  substring match, and first-match-in-list-order is preserved, so
+  output is identical to v10.
+
+  CONCURRENT KALSHI SWEEP — v10 asked for the 34 series one at a time
+  with a 0.15s sleep between calls (and 0.3s between browse pages), so
+  the sweep cost ~34 round trips plus ~5s of sleeping. v11 fans the
+  series out over KALSHI_WORKERS threads behind one shared token bucket
+  (KALSHI_RATE requests/s, under Kalshi's published read limit); the
+  browse pages draw from the same bucket instead of sleeping. Results
+  are still processed in KALSHI_SERIES order, so dedup and output are
+  unchanged, and the auth / empty / network / not-found outcomes are
+  counted per series and reported in one line.
+
+  CONCURRENT POLYMARKET SWEEP — the events query, the 17 tag queries and
+  the top-volume query used to run back to back with 0.2-0.3s sleeps.
+  v11 issues all of them at once under POLY_LIMITER and merges each
+  response into the shared `seen` set as it arrives, so the phase takes
+  about as long as its slowest request. When two queries return the
+  same market, whichever lands first supplies the record.
+
+  KEEP-ALIVE HTTP — urlopen() opened a fresh TCP+TLS connection for each
+  of the ~55 requests and never asked for compression. http_get() now
+  goes through HTTP, a small per-host pool of persistent http.client
+  connections shared by the worker threads, sending Accept-Encoding:
+  gzip (plus br when the brotli package is installed). Redirects are
+  followed, and a keep-alive socket the server has already closed is
+  retried once on a fresh connection. The run summary reports requests,
+  connections opened and body bytes on the wire vs decoded, per host.
+
+  SCORING CACHE — most markets live for weeks, but every run re-ran
+  is_junk / score_relevance / get_category / _ladder_family on every
+  candidate. Results are now kept in data/markets-score-cache.json,
+  keyed by a hash of the market's text fields and ticker plus
+  KEYWORD_VERSION, a digest of every keyword table and scoring constant
+  (so editing a list invalidates the cache by itself). A run only
+  scores markets it hasn't seen; entries unseen for SCORE_CACHE_DAYS
+  are dropped. Markets below MIN_RELEVANCE (junk included) are saved
+  as a bare [day, score] so they are not re-scored either; Kalshi junk
+  tickers skip the cache entirely (the regex is cheaper than a lookup).
+  An entry's last-seen day only moves forward once a week, and the file
+  is written one entry per line, so each run's diff stays local.
+
+  ODDS HISTORY + MOVERS — markets.json was a bare snapshot. Every
+  selected market's yes % and volume is now appended to a delta-encoded
+  series in data/markets-history.json (odds_history.py), keyed by
+  platform + ticker, and the same run reads the change back: each market
+  gets change_24h / change_7d (yes-% points, null until the series is
+  old enough) and the output gains a `movers` block with the biggest
+  24h and 7d moves. No extra API calls.
+
+  CROSS-PLATFORM DEDUP — Kalshi and Polymarket often list the same
+  question under different wording ("Fed cut in June?" / "Will the Fed
+  cut rates in June?"), and v10's exact-title pass kept both. v11
+  MinHashes each title's normalized word set, buckets the signatures
+  with banded LSH, and verifies only bucket-mates from different
+  platforms by exact Jaccard, with the titles' numbers, months and years
+  required to agree. A confirmed pair becomes one record (the higher
+  composite score) with the other platform's odds under `also_on`.
+  Work is linear in candidates; nothing is compared pairwise.
+
+  RESUMABLE KALSHI BROWSE — v10 browsed /markets from page one every run
+  and stopped after 10 pages or 50 kept markets, so the same first pages
+  were scanned daily and the rest of the open universe never was. v11
+  keeps the cursor in data/kalshi-browse.json and resumes from it, stops
+  a run early after KALSHI_DRY_PAGES pages with nothing above
+  MIN_RELEVANCE, and starts a new sweep when the cursor runs out. A
+  saved cursor the API rejects is dropped at once; one that only hits
+  network errors is kept, but for at most KALSHI_CURSOR_FAILS runs in a
+  row (counted in the same file) before the sweep restarts. Markets
+  a sweep turns up are remembered and re-priced each run in batched
+  `tickers=` lookups, so coverage accumulates across runs. Per-page
+  yields (and their running average) are saved alongside.
+
+  --refresh MODE — discovery still runs once a day, so by evening the
+  odds in markets.json were up to a day old. `fetch_markets.py
+  --refresh` (hourly, markets-refresh.yml) keeps the previous selection
+  and only re-prices it: one batched Kalshi `tickers=` lookup and one
+  Polymarket `id=` lookup, instead of the ~55 requests of a full run.
+  Discovery, scoring, ladder/dedup and quotas are skipped; yes/no,
+  volume, time left and why_it_matters are updated, closed markets are
+  dropped, and the odds history and movers advance as in a full run.
+
 v10 changes (2026-04-23):
 
   STRIKE-LADDER DEDUP — v9 pushed 22 near-identical crude-strike markets
@@ -35,35 +127,115 @@ v10 changes (2026-04-23):
   Retains all v9 word-boundary fixes and blacklists.
 """
 
+import gzip
+import hashlib
+import http.client
+import argparse
 import json
+import random
 import re
 import os
+import zlib
 import math
+import threading
 import time
+from collections import Counter, deque
+from itertools import combinations
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from functools import lru_cache
+
+import odds_history
+
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote as url_quote, urljoin, urlsplit
 
 try:
-    import urllib.request as urllib_request
-    from urllib.parse import quote as url_quote
-except ImportError:
-    import urllib2 as urllib_request
-    from urllib import quote as url_quote
+    import brotli
+except ImportError:     # optional: without it we only ask for gzip
+    brotli = None
 
 
 # ================================================================
-# 1. WORD-BOUNDARY HELPER  (retained from v9)
+# 1. KEYWORD MATCHER  (v11: one automaton for every keyword list)
 # ================================================================
 
-_KW_RE_CACHE: dict = {}
+# Characters that count as "inside a word" for whole-word keywords. This is
+# exactly what v9's case-insensitive (?<![a-z0-9]) / (?![a-z0-9]) accepted,
+# including the four non-ASCII letters that case-fold into a-z.
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789"
+                        "ABCDEFGHIJKLMNOPQRSTUVWXYZ\u0130\u0131\u017f\u212a")
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick matcher over (group, index, keyword, whole_word) entries.
+    scan(text) reports every entry found in text as
+    {group: sorted indices}; whole_word entries only count when neither
+    neighbour is in _WORD_CHARS, the rest are plain substring matches.
+    """
+
+    def __init__(self, entries):
+        goto, out = [{}], [[]]
+        for group, idx, kw, whole in entries:
+            node = 0
+            for ch in kw:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append((group, idx, len(kw), whole))
+
+        # Breadth-first failure links; each node's output inherits the
+        # output of its longest proper suffix state.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def scan(self, text):
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = {}
+        node, last = 0, len(text) - 1
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for group, idx, size, whole in out[node]:
+                if whole and ((i >= size and text[i - size] in _WORD_CHARS)
+                              or (i < last and text[i + 1] in _WORD_CHARS)):
+                    continue
+                hits.setdefault(group, set()).add(idx)
+        return {group: sorted(found) for group, found in hits.items()}
+
+
+# v9's tier-1 regexes were IGNORECASE, so "hogs" also matched "hogſ": the
+# only two characters that survive .lower() and still case-fold onto a-z.
+_WORD_FOLD = str.maketrans({"\u0131": "i", "\u017f": "s"})
 
-def _has_word(text: str, word: str) -> bool:
-    """True if word appears as a whole token (non-alnum boundaries)."""
-    if word not in _KW_RE_CACHE:
-        _KW_RE_CACHE[word] = re.compile(
-            r'(?<![a-z0-9])' + re.escape(word) + r'(?![a-z0-9])',
-            re.IGNORECASE,
-        )
-    return bool(_KW_RE_CACHE[word].search(text))
+
+@lru_cache(maxsize=4096)
+def _scan(text):
+    """Every keyword hit in already-lowercased text (see _MATCHER, section 5)."""
+    hits = _MATCHER.scan(text)
+    folded = text.translate(_WORD_FOLD)
+    if folded != text:
+        hits["tier1"] = _MATCHER.scan(folded).get("tier1", [])
+        if not hits["tier1"]:
+            del hits["tier1"]
+    return hits
 
 
 # ================================================================
@@ -207,20 +379,17 @@ SPORTS_PLAYER_RE = [
 
 KALSHI_JUNK_RE = [r"^KXMVE", r"CROSSCATEGORY", r"^KX.*PARLAY"]
 
+_KALSHI_JUNK = re.compile("|".join(KALSHI_JUNK_RE))
+_SPORTS_PLAYER = re.compile("|".join(SPORTS_PLAYER_RE))
+
 
 def is_junk(title, ticker=""):
     t = title.lower()
-    if ticker:
-        for p in KALSHI_JUNK_RE:
-            if re.search(p, ticker.upper()):
-                return True
-    for p in MEME_BLACKLIST + SPORTS_BLACKLIST:
-        if p in t:
-            return True
-    for p in SPORTS_PLAYER_RE:
-        if re.search(p, t):
-            return True
-    return False
+    if ticker and _KALSHI_JUNK.search(ticker.upper()):
+        return True
+    if "junk" in _scan(t):
+        return True
+    return bool(_SPORTS_PLAYER.search(t))
 
 
 # ================================================================
@@ -234,6 +403,8 @@ def score_relevance(text, ticker=""):
       - Kalshi ticker-prefix hint fallback (catches KXCORN-* when title is empty)
     """
     t = text.lower()
+    hits = _scan(t)
+    t1, t2, t3 = hits.get("tier1", ()), hits.get("tier2", ()), hits.get("tier3", ())
     score, tier = 0, 0
     matched_kws = []
 
@@ -254,59 +425,39 @@ def score_relevance(text, ticker=""):
                     matched_kws.append(implied_kw)
                 break
 
+    # Hit lists are in keyword-list order, so [0] is the keyword v10's
+    # first-match loops would have stopped on.
+
     # TIER 1 — whole-word match
-    if tier < 1:
-        for kw in TIER1_KEYWORDS:
-            if _has_word(t, kw):
-                score, tier = 100, 1
-                matched_kws.append(kw)
-                break
+    if tier < 1 and t1:
+        score, tier = 100, 1
+        matched_kws.append(TIER1_KEYWORDS[t1[0]])
 
     # TIER 2 — substring match (phrases OK)
-    if score < 100:
-        for kw in TIER2_KEYWORDS:
-            if kw in t:
-                if tier == 0:
-                    score, tier = 70, 2
-                matched_kws.append(kw)
-                break
+    if score < 100 and t2:
+        if tier == 0:
+            score, tier = 70, 2
+        matched_kws.append(TIER2_KEYWORDS[t2[0]])
 
     # TIER 3 — substring match
-    if score < 70:
-        for kw in TIER3_KEYWORDS:
-            if kw in t:
-                score, tier = 40, 3
-                matched_kws.append(kw)
-                break
+    if score < 70 and t3:
+        score, tier = 40, 3
+        matched_kws.append(TIER3_KEYWORDS[t3[0]])
 
     # Tier-3 upgrade if it ALSO contains a tier-1/2 keyword
     if tier == 3:
-        for kw in TIER1_KEYWORDS:
-            if _has_word(t, kw):
-                score = min(100, score + 30)
-                matched_kws.append(kw)
-                break
-        else:
-            for kw in TIER2_KEYWORDS:
-                if kw in t:
-                    score = min(100, score + 15)
-                    matched_kws.append(kw)
-                    break
+        if t1:
+            score = min(100, score + 30)
+            matched_kws.append(TIER1_KEYWORDS[t1[0]])
+        elif t2:
+            score = min(100, score + 15)
+            matched_kws.append(TIER2_KEYWORDS[t2[0]])
 
     # v10: intra-tier bumps for differentiation
     if tier > 0:
         # Bonus for multiple keyword matches across any tier
-        extra_hits = 0
-        for kw in TIER1_KEYWORDS:
-            if kw not in matched_kws and _has_word(t, kw):
-                extra_hits += 1
-                if extra_hits >= 3:
-                    break
-        for kw in TIER2_KEYWORDS:
-            if kw not in matched_kws and kw in t:
-                extra_hits += 1
-                if extra_hits >= 3:
-                    break
+        extra_hits = (sum(1 for i in t1 if TIER1_KEYWORDS[i] not in matched_kws)
+                      + sum(1 for i in t2 if TIER2_KEYWORDS[i] not in matched_kws))
         score += min(extra_hits * 3, 9)
 
     return score, tier
@@ -352,12 +503,8 @@ AG_CATEGORIES = [
 
 
 def get_category(text):
-    t = text.lower()
-    for cat, kws in AG_CATEGORIES:
-        for kw in kws:
-            if kw in t:
-                return cat
-    return "Other"
+    cats = _scan(text.lower()).get("category")
+    return AG_CATEGORIES[cats[0]][0] if cats else "Other"
 
 
 # ----------------------------------------------------------------
@@ -398,6 +545,19 @@ WHY_MAP = [
 ]
 
 
+# v11: every keyword list above, compiled once. Group names are what
+# _scan() returns; indices point back into the source list (for
+# AG_CATEGORIES, the category's position).
+_MATCHER = KeywordAutomaton(
+    [("tier1", i, kw, True) for i, kw in enumerate(TIER1_KEYWORDS)]
+    + [("tier2", i, kw, False) for i, kw in enumerate(TIER2_KEYWORDS)]
+    + [("tier3", i, kw, False) for i, kw in enumerate(TIER3_KEYWORDS)]
+    + [("junk", 0, kw, False) for kw in MEME_BLACKLIST + SPORTS_BLACKLIST]
+    + [("category", i, kw, False) for i, (_, kws) in enumerate(AG_CATEGORIES) for kw in kws]
+    + [("why", i, kw, False) for i, (kw, _) in enumerate(WHY_MAP)]
+)
+
+
 # ----------------------------------------------------------------
 # v10: Context-aware generators for ladder markets
 # ----------------------------------------------------------------
@@ -486,30 +646,139 @@ def get_why(title, yes_pct=50, time_left="", close_time=""):
         return _fed_why(title, yes_pct)
 
     # Static fallback for everything else
-    for kw, why in WHY_MAP:
-        if kw in t:
-            return why
+    why = _scan(t).get("why")
+    if why:
+        return WHY_MAP[why[0]][1]
 
     return "Reflects conditions that can affect agricultural commodity prices, input costs, or farm policy."
 
 
 # ================================================================
-# 6. HTTP HELPER  (v10: distinguish auth vs network vs empty)
+# 6. HTTP HELPER  (v10: distinguish auth vs network vs empty;
+#                  v11: pooled keep-alive connections + compression)
 # ================================================================
 
+HTTP_HEADERS = {
+    "User-Agent": "AGSIST/11.0 (agsist.com; agricultural market intelligence)",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, br" if brotli else "gzip",
+}
+HTTP_MAX_REDIRECTS = 3
+
+# Raised by a keep-alive socket the server closed while it sat idle.
+_STALE = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+          http.client.BadStatusLine, BrokenPipeError, ConnectionResetError)
+
+
+class HttpPool:
+    """
+    Persistent HTTPS connections, pooled per host and shared across
+    threads. get() returns the decoded body or raises the same
+    HTTPError / URLError urlopen() would, so http_get()'s error
+    classification is unchanged. Tracks requests, connections opened and
+    body bytes (wire vs decoded) per host.
+    """
+
+    def __init__(self, per_host=20):
+        self.per_host = per_host
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.connects = Counter()
+        self.wire = Counter()
+        self.decoded = Counter()
+
+    def _checkout(self, host, timeout):
+        with self._lock:
+            idle = self._idle.get(host)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                return conn, True
+            self.connects[host] += 1
+        return http.client.HTTPSConnection(host, timeout=timeout), False
+
+    def _checkin(self, host, conn):
+        with self._lock:
+            idle = self._idle.setdefault(host, [])
+            if len(idle) < self.per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _request(self, host, path, timeout):
+        """One GET on a pooled connection; a stale keep-alive is retried once."""
+        while True:
+            conn, reused = self._checkout(host, timeout)
+            try:
+                conn.request("GET", path, headers=HTTP_HEADERS)
+                resp = conn.getresponse()
+                body = resp.read()
+            except _STALE:
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(host, conn)
+            return resp, body
+
+    def get(self, url, timeout=20):
+        for _ in range(HTTP_MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            host = parts.netloc
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            try:
+                resp, body = self._request(host, path, timeout)
+            except (OSError, http.client.HTTPException) as e:
+                raise URLError(e)
+            with self._lock:
+                self.requests[host] += 1
+                self.wire[host] += len(body)
+            if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+                url = urljoin(url, resp.getheader("Location"))
+                continue
+            if resp.status >= 400:
+                raise HTTPError(url, resp.status, resp.reason, resp.headers, None)
+            encoding = (resp.getheader("Content-Encoding") or "").lower()
+            if encoding == "gzip":
+                body = gzip.decompress(body)
+            elif encoding == "deflate":
+                body = zlib.decompress(body)
+            elif encoding == "br" and brotli:
+                body = brotli.decompress(body)
+            with self._lock:
+                self.decoded[host] += len(body)
+            return body
+        raise URLError(f"too many redirects: {url}")
+
+    def report(self):
+        for host in sorted(self.requests):
+            wire, dec = self.wire[host], self.decoded[host]
+            ratio = f"  ({wire / dec:.0%} of decoded)" if dec else ""
+            print(f"  {host:28s} {self.requests[host]:3d} req  {self.connects[host]:2d} conn  "
+                  f"{wire / 1024:8.1f} KB wire  {dec / 1024:8.1f} KB decoded{ratio}")
+
+
+HTTP = HttpPool()
+
+
 def http_get(url, timeout=20):
     """
     v10: Returns (data, error_kind) where error_kind is one of:
       None (success), "auth" (401/403), "network", "parse", "notfound"
     Callers expecting v9 behavior can ignore error_kind via a wrapper.
+    v11: other 4xx answers (bad request, gone, ...) are "rejected";
+      "network" now means only errors worth retrying as-is (timeouts,
+      connection failures, 429 and 5xx).
     """
     try:
-        req = urllib_request.Request(url, headers={
-            "User-Agent": "AGSIST/10.0 (agsist.com; agricultural market intelligence)",
-            "Accept": "application/json",
-        })
-        with urllib_request.urlopen(req, timeout=timeout) as r:
-            return json.loads(r.read().decode("utf-8")), None
+        return json.loads(HTTP.get(url, timeout=timeout).decode("utf-8")), None
     except Exception as e:
         name = type(e).__name__
         code = getattr(e, "code", None)
@@ -518,6 +787,9 @@ def http_get(url, timeout=20):
             return None, "auth"
         if code == 404:
             return None, "notfound"
+        if code is not None and 400 <= code < 500 and code != 429:
+            print(f"  REJ  [{url[:75]}]: HTTP {code}")
+            return None, "rejected"
         if "HTTPError" in name or "URLError" in name:
             print(f"  NET  [{url[:75]}]: {name}: {e}")
             return None, "network"
@@ -525,6 +797,31 @@ def http_get(url, timeout=20):
         return None, "parse"
 
 
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `burst`
+    banked. acquire() blocks until a token is free.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate, self.burst = float(rate), float(burst)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 def _get(url, timeout=20):
     """v9-compatible wrapper: returns data or None."""
     data, _ = http_get(url, timeout)
@@ -552,6 +849,23 @@ def time_remaining(close_str):
 
 KALSHI_BASE = "https://trading-api.kalshi.com/trade-api/v2"
 
+# v11: Kalshi's Basic API tier allows 20 reads/s; stay at half that so a
+# run never trips the limiter even with clock jitter. Every Kalshi request
+# goes through KALSHI_LIMITER.
+KALSHI_RATE    = 10
+KALSHI_BURST   = 5
+KALSHI_WORKERS = 8
+KALSHI_LIMITER = TokenBucket(KALSHI_RATE, KALSHI_BURST)
+
+# v11: browse state carried between runs (see fetch_kalshi)
+KALSHI_BROWSE_PATH  = "data/kalshi-browse.json"
+KALSHI_BROWSE_PAGES = 10    # page budget per run
+KALSHI_DRY_PAGES    = 3     # consecutive pages with no relevant market -> stop
+KALSHI_FOUND_DAYS   = 14    # forget a browse find not seen open for this long
+KALSHI_CURSOR_FAILS = 3     # runs in a row the saved cursor may fail before a restart
+KALSHI_TICKER_CHUNK = 100   # tickers per batched lookup
+KALSHI_YIELD_ALPHA  = 0.2   # weight of the newest page in the yield average
+
 # v10: Expanded series list (added newer/common ag + weather tickers)
 KALSHI_SERIES = [
     # Macro
@@ -575,52 +889,207 @@ KALSHI_SERIES = [
 ]
 
 
+def kalshi_get(url):
+    """http_get() behind the shared Kalshi rate limit."""
+    KALSHI_LIMITER.acquire()
+    return http_get(url)
+
+
+def _fetch_series(series):
+    return kalshi_get(f"{KALSHI_BASE}/markets?limit=50&status=open&series_ticker={series}")
+
+
 def fetch_kalshi():
     print("\n[Kalshi] series + pagination...")
     markets, seen = [], set()
-    auth_fails = 0
+    outcomes = Counter()
     series_hits = 0
 
-    for series in KALSHI_SERIES:
-        data, err = http_get(f"{KALSHI_BASE}/markets?limit=50&status=open&series_ticker={series}")
-        if err == "auth":
-            auth_fails += 1
-        elif data:
-            n = _process_kalshi_items(data.get("markets", []), markets, seen)
-            if n:
-                series_hits += 1
-                print(f"  {series}: {n}")
-        time.sleep(0.15)
-
+    # v11: series requests run concurrently, paced by KALSHI_LIMITER; the
+    # responses are processed in list order on this thread.
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=KALSHI_WORKERS) as pool:
+        responses = list(pool.map(_fetch_series, KALSHI_SERIES))
+    for series, (data, err) in zip(KALSHI_SERIES, responses):
+        if err:
+            outcomes[err] += 1
+            continue
+        items = (data or {}).get("markets", [])
+        if not items:
+            outcomes["empty"] += 1
+            continue
+        outcomes["ok"] += 1
+        n = _process_kalshi_items(items, markets, seen)
+        if n:
+            series_hits += 1
+            print(f"  {series}: {n}")
+    print(f"  {len(KALSHI_SERIES)} series in {time.monotonic() - started:.1f}s -- "
+          + ", ".join(f"{k} {outcomes[k]}" for k in ("ok", "empty", "auth", "network", "notfound",
+                                                "rejected", "parse")
+                      if outcomes[k]))
+
+    auth_fails = outcomes["auth"]
     if auth_fails >= len(KALSHI_SERIES) // 2:
         print(f"  [WARN] {auth_fails} series auth-failed -- Kalshi may now require credentials")
 
-    # v10: deeper pagination (up to 10 pages) for broader coverage
+    state = _load_browse_state()
+    today = datetime.now(timezone.utc).date().toordinal()
+
+    # v11: re-price what earlier browse pages found
+    found = state["found"]
+    if found:
+        n = _fetch_kalshi_tickers(sorted(found), markets, seen, found)
+        print(f"  Browse finds: {n} of {len(found)} still relevant")
+
+    # v10: deeper pagination for broader coverage
+    # v11: resumes from the saved cursor; stops on a dry streak
+    # A saved cursor that fails outright, or keeps failing, is dropped so a
+    # bad cursor can never stall discovery; only a network error on a
+    # cursor that has not yet failed KALSHI_CURSOR_FAILS runs is kept.
     url = f"{KALSHI_BASE}/markets?limit=200&status=open"
-    cursor, pages, browsed = "", 0, 0
-    while pages < 10:
-        data, err = http_get(url + (f"&cursor={cursor}" if cursor else ""))
+    cursor = state["cursor"]
+    if cursor and state["cursor_fails"] >= KALSHI_CURSOR_FAILS:
+        cursor = _restart_sweep(state, f"saved cursor failed {state['cursor_fails']} runs running")
+    pages = browsed = dry = 0
+    page_log = []
+    while pages < KALSHI_BROWSE_PAGES:
+        data, err = kalshi_get(url + (f"&cursor={url_quote(cursor)}" if cursor else ""))
         if err == "auth":
             print("  [stopping browse: auth-required]")
             break
         if not data:
-            break
+            if cursor and pages == 0:
+                if err != "network":
+                    cursor = _restart_sweep(state, f"saved cursor {err or 'returned no data'}")
+                    continue
+                state["cursor_fails"] += 1
+            break   # transient: keep the cursor; next run retries this page
         items = data.get("markets", [])
         if not items:
+            if cursor and pages == 0:
+                cursor = _restart_sweep(state, "saved cursor returned nothing")
+                continue
+            cursor = ""
             break
+        state["cursor_fails"] = 0
+        before = len(markets)
         n = _process_kalshi_items(items, markets, seen)
+        for m in markets[before:]:
+            found[m["ticker"]] = today
         browsed += len(items)
-        cursor = data.get("cursor", "")
         pages += 1
-        print(f"  Page {pages}: {len(items)} scanned, {n} new, {len(markets)} total")
-        if not cursor or len(markets) >= 50:
+        state["page"] += 1
+        state["yield"] = round((1 - KALSHI_YIELD_ALPHA) * state["yield"]
+                               + KALSHI_YIELD_ALPHA * n / len(items), 4)
+        page_log.append([state["page"], len(items), n])
+        cursor = data.get("cursor", "")
+        print(f"  Page {state['page']} (sweep {state['sweep']}): {len(items)} scanned, "
+              f"{n} new, {len(markets)} total")
+        if not cursor:
+            print(f"  [sweep {state['sweep']} complete after {state['page']} pages]")
+            state["sweep"] += 1
+            state["page"] = 0
             break
-        time.sleep(0.3)
+        dry = 0 if n else dry + 1
+        if dry >= KALSHI_DRY_PAGES:
+            print(f"  [stopping browse: {dry} pages with nothing above MIN_RELEVANCE]")
+            break
+
+    state["cursor"] = cursor
+    state["last_run"] = page_log
+    state["found"] = {t: d for t, d in found.items() if d >= today - KALSHI_FOUND_DAYS}
+    _save_browse_state(state)
 
-    print(f"  -> {len(markets)} Kalshi markets ({browsed} scanned, {series_hits} series produced results)")
+    print(f"  -> {len(markets)} Kalshi markets ({browsed} scanned, {series_hits} series produced results, "
+          f"page yield avg {state['yield']:.1%})")
     return markets
 
 
+def _load_browse_state():
+    state = {"cursor": "", "sweep": 1, "page": 0, "yield": 0.0, "last_run": [], "found": {},
+             "cursor_fails": 0}
+    try:
+        with open(KALSHI_BROWSE_PATH) as f:
+            state.update(json.load(f))
+    except Exception:
+        pass
+    return state
+
+
+def _restart_sweep(state, why):
+    """Abandon the saved cursor and start a new sweep from page one; returns the empty cursor."""
+    print(f"  [{why} -- restarting sweep]")
+    state["sweep"] += 1
+    state["page"] = state["cursor_fails"] = 0
+    return ""
+
+
+def _save_browse_state(state):
+    state["updated"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    os.makedirs(os.path.dirname(KALSHI_BROWSE_PATH), exist_ok=True)
+    with open(KALSHI_BROWSE_PATH, "w") as f:
+        json.dump(state, f, separators=(",", ":"))
+
+
+def _fetch_kalshi_tickers(tickers, markets, seen, found=None):
+    """
+    Look markets up by ticker in batches of KALSHI_TICKER_CHUNK and run
+    them through _process_kalshi_items. With `found`, tickers the API no
+    longer returns as open are dropped from it and the rest get today's
+    date. Returns markets added.
+    """
+    today = datetime.now(timezone.utc).date().toordinal()
+    added = 0
+    for i in range(0, len(tickers), KALSHI_TICKER_CHUNK):
+        chunk = tickers[i:i + KALSHI_TICKER_CHUNK]
+        data, err = kalshi_get(f"{KALSHI_BASE}/markets?limit={len(chunk)}&status=open"
+                               f"&tickers={url_quote(','.join(chunk), safe=',')}")
+        if err or data is None:
+            continue
+        items = data.get("markets", [])
+        added += _process_kalshi_items(items, markets, seen)
+        if found is not None:
+            open_now = {m.get("ticker") for m in items}
+            for t in chunk:
+                if t in open_now:
+                    found[t] = today
+                else:
+                    found.pop(t, None)
+    return added
+
+
+def _parse_kalshi_prob(m):
+    prob = None
+    for f in ("yes_price", "last_price"):
+        v = m.get(f)
+        if v is not None:
+            try:
+                n = float(v)
+                prob = round(n * 100) if n <= 1.0 else round(n)
+                break
+            except Exception:
+                pass
+    if prob is None:
+        yb, ya = m.get("yes_bid"), m.get("yes_ask")
+        if yb is not None and ya is not None:
+            try:
+                mid = (float(yb) + float(ya)) / 2
+                prob = round(mid * 100) if mid <= 1.0 else round(mid)
+            except Exception:
+                pass
+    return prob if prob is not None and 0 < prob < 100 else None
+
+
+def _parse_kalshi_volume(m):
+    for f in ("volume", "volume_24h", "dollar_volume"):
+        if m.get(f):
+            try:
+                return float(m[f])
+            except Exception:
+                pass
+    return 0
+
+
 def _process_kalshi_items(items, markets, seen):
     added = 0
     for m in items:
@@ -640,43 +1109,19 @@ def _process_kalshi_items(items, markets, seen):
         # Scoring text: everything combined so keyword match has best chance
         search_text = " ".join(filter(None, [title, sub, yes_sub, no_sub, ev]))
 
-        if is_junk(f"{display_title} {sub} {ev}", ticker):
-            continue
-
         # v10: pass ticker too so KXCORN-* etc. can score tier-1 via prefix
-        score, tier = score_relevance(search_text or ticker, ticker=ticker)
+        # v11: junk / score / category / ladder come from SCORE_CACHE
+        score, tier, category, ladder = SCORE_CACHE.classify(
+            ScoreCache.key(ticker, title, sub, yes_sub, no_sub, ev), ticker,
+            junk_text=f"{display_title} {sub} {ev}", score_text=search_text or ticker,
+            category_text=search_text, title=display_title)
         if score < MIN_RELEVANCE:
             continue
 
-        prob = None
-        for f in ("yes_price", "last_price"):
-            v = m.get(f)
-            if v is not None:
-                try:
-                    n = float(v)
-                    prob = round(n * 100) if n <= 1.0 else round(n)
-                    break
-                except Exception:
-                    pass
+        prob = _parse_kalshi_prob(m)
         if prob is None:
-            yb, ya = m.get("yes_bid"), m.get("yes_ask")
-            if yb is not None and ya is not None:
-                try:
-                    mid = (float(yb) + float(ya)) / 2
-                    prob = round(mid * 100) if mid <= 1.0 else round(mid)
-                except Exception:
-                    pass
-        if prob is None or not (0 < prob < 100):
             continue
-
-        vol = 0
-        for f in ("volume", "volume_24h", "dollar_volume"):
-            if m.get(f):
-                try:
-                    vol = float(m[f])
-                    break
-                except Exception:
-                    pass
+        vol = _parse_kalshi_volume(m)
 
         close_time = m.get("close_time") or m.get("expiration_time") or ""
         tl = time_remaining(close_time)
@@ -697,8 +1142,9 @@ def _process_kalshi_items(items, markets, seen):
             "url": f"https://kalshi.com/markets/{ep}",
             "relevance": score,
             "tier": tier,
-            "category": get_category(search_text),
+            "category": category,
             "why_it_matters": get_why(display_title, prob, tl, close_time),
+            "_ladder": ladder,
         })
         added += 1
     return added
@@ -720,36 +1166,54 @@ POLY_TAGS = [
 ]
 
 
+# v11: Gamma allows ~100 requests / 10s on /events and /markets. One run
+# makes 19, so the whole sweep fits in the burst and goes out at once.
+POLY_RATE    = 10
+POLY_BURST   = 20
+POLY_WORKERS = 20
+POLY_LIMITER = TokenBucket(POLY_RATE, POLY_BURST)
+
+
+def poly_get(url):
+    """_get() behind the shared Polymarket rate limit."""
+    POLY_LIMITER.acquire()
+    return _get(url)
+
+
 def fetch_polymarket():
     print("\n[Polymarket] /events + tag_slug + volume...")
     markets, seen = [], set()
 
-    print("  A: /events by volume...")
-    data = _get(f"{POLY_BASE}/events?active=true&closed=false&limit=100&order=volume&ascending=false")
-    if data:
-        events = data if isinstance(data, list) else data.get("events", data.get("results", []))
-        n = _process_poly_events(events, markets, seen)
-        print(f"     {n} relevant from {len(events)} events")
-    time.sleep(0.3)
-
-    print("  B: tag_slug...")
-    for tag in POLY_TAGS:
-        data = _get(f"{POLY_BASE}/markets?active=true&closed=false&limit=100&tag_slug={url_quote(tag)}")
-        if data:
-            items = data if isinstance(data, list) else data.get("results", data.get("markets", []))
-            n = _process_poly_markets(items, markets, seen)
-            if n:
-                print(f"     {tag}: {n}")
-        time.sleep(0.2)
-
-    print("  C: top by volume...")
-    data = _get(f"{POLY_BASE}/markets?active=true&closed=false&limit=100&order=volume&ascending=false")
-    if data:
-        items = data if isinstance(data, list) else data.get("results", data.get("markets", []))
-        n = _process_poly_markets(items, markets, seen)
-        print(f"     {n} relevant")
-
-    print(f"  -> {len(markets)} Polymarket markets")
+    # (label, kind, url): A = events by volume, B = one per tag, C = top markets
+    queries = [("A: /events by volume", "events",
+                f"{POLY_BASE}/events?active=true&closed=false&limit=100&order=volume&ascending=false")]
+    queries += [(f"B: {tag}", "markets",
+                 f"{POLY_BASE}/markets?active=true&closed=false&limit=100&tag_slug={url_quote(tag)}")
+                for tag in POLY_TAGS]
+    queries.append(("C: top by volume", "markets",
+                    f"{POLY_BASE}/markets?active=true&closed=false&limit=100&order=volume&ascending=false"))
+
+    # v11: all queries in flight together; each response is merged on this
+    # thread as soon as it lands, against the one shared `seen` set.
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=POLY_WORKERS) as pool:
+        pending = {pool.submit(poly_get, url): (label, kind) for label, kind, url in queries}
+        for fut in as_completed(pending):
+            label, kind = pending[fut]
+            data = fut.result()
+            if not data:
+                continue
+            if kind == "events":
+                events = data if isinstance(data, list) else data.get("events", data.get("results", []))
+                n = _process_poly_events(events, markets, seen)
+                print(f"  {label}: {n} relevant from {len(events)} events")
+            else:
+                items = data if isinstance(data, list) else data.get("results", data.get("markets", []))
+                n = _process_poly_markets(items, markets, seen)
+                if n or not label.startswith("B:"):
+                    print(f"  {label}: {n}")
+
+    print(f"  -> {len(markets)} Polymarket markets ({len(queries)} queries in {time.monotonic() - started:.1f}s)")
     return markets
 
 
@@ -788,26 +1252,30 @@ def _parse_poly_prob(m):
     return prob if prob and 0 < prob < 100 else None
 
 
+def _parse_poly_volume(m):
+    for f in ("volume", "volume24hr", "volume_num", "volumeNum", "liquidityNum"):
+        if m.get(f):
+            try:
+                return float(m[f])
+            except Exception:
+                pass
+    return 0
+
+
 def _make_poly_record(m, question, seen):
     mid = str(m.get("id") or m.get("condition_id") or m.get("conditionId") or "").strip()
     if not mid or mid in seen:
         return None
-    if is_junk(question):
-        return None
-    score, tier = score_relevance(question)
+    score, tier, category, ladder = SCORE_CACHE.classify(
+        ScoreCache.key(mid, question), "",
+        junk_text=question, score_text=question,
+        category_text=question, title=question[:140])
     if score < MIN_RELEVANCE:
         return None
     prob = _parse_poly_prob(m)
     if prob is None:
         return None
-    vol = 0
-    for f in ("volume", "volume24hr", "volume_num", "volumeNum", "liquidityNum"):
-        if m.get(f):
-            try:
-                vol = float(m[f])
-                break
-            except Exception:
-                pass
+    vol = _parse_poly_volume(m)
     slug = m.get("slug", "")
     url = f"https://polymarket.com/event/{slug}" if slug else m.get("url", f"https://polymarket.com/event/{mid}")
     ed = m.get("endDate") or m.get("end_date_iso") or m.get("endDateIso") or ""
@@ -828,8 +1296,9 @@ def _make_poly_record(m, question, seen):
         "slug": slug,
         "relevance": score,
         "tier": tier,
-        "category": get_category(question),
+        "category": category,
         "why_it_matters": get_why(question, prob, tl, ed),
+        "_ladder": ladder,
     }
 
 
@@ -925,7 +1394,7 @@ def collapse_ladders(markets, max_per_family=2):
     families = {}
     singletons = []
     for m in markets:
-        fam, strike = _ladder_family(m.get("title", ""))
+        fam, strike = m.pop("_ladder", None) or _ladder_family(m.get("title", ""))
         if fam is None:
             singletons.append(m)
             continue
@@ -962,7 +1431,215 @@ def collapse_ladders(markets, max_per_family=2):
 
 
 # ================================================================
-# 10. COMPOSITE SCORING  (v10 rebalanced)
+# 10. CROSS-PLATFORM DEDUP  (v11 NEW — MinHash / LSH)
+# ================================================================
+
+DUP_STOPWORDS = frozenset(
+    "will the a an in on of by to be is are at for before after end than "
+    "this that there it its any what who how does do price us".split())
+DUP_MONTHS = frozenset(
+    "jan feb mar apr may jun jul aug sep sept oct nov dec january february march "
+    "april june july august september october november december".split())
+
+DUP_JACCARD  = 0.7    # word-set similarity that counts as the same question
+DUP_BANDS    = 16
+DUP_ROWS     = 3      # 48 hashes; a pair at J=0.7 shares a band >99% of the time
+DUP_BUCKET_CAP = 40   # a bucket this crowded is boilerplate, not a duplicate
+
+_MH_PRIME = (1 << 61) - 1
+_MH_RNG = random.Random(2026)
+_MH_PARAMS = [(_MH_RNG.randrange(1, _MH_PRIME), _MH_RNG.randrange(_MH_PRIME))
+              for _ in range(DUP_BANDS * DUP_ROWS)]
+
+
+def _dup_words(title):
+    """Normalized word set: lowercase, stopwords out, plural 's' trimmed."""
+    words = set()
+    for w in re.findall(r"[a-z0-9]+", title.lower()):
+        if w in DUP_STOPWORDS:
+            continue
+        if len(w) > 3 and w.endswith("s") and not w[0].isdigit():
+            w = w[:-1]
+        words.add(w)
+    return frozenset(words)
+
+
+_DUP_COMMODITIES = frozenset(w for kw in TIER1_KEYWORDS if " " not in kw for w in _dup_words(kw))
+
+
+def _dup_anchors(words):
+    """
+    Numbers, months, years and tier-1 commodity words: two titles that
+    differ here are different markets ("egg prices above $4" is not
+    "corn prices above $4", however similar the rest).
+    """
+    return frozenset(w for w in words if w[0].isdigit() or w in DUP_MONTHS or w in _DUP_COMMODITIES)
+
+
+def _minhash(words):
+    hashes = [int.from_bytes(hashlib.blake2b(w.encode(), digest_size=8).digest(), "big")
+              for w in words]
+    return [min((a * h + b) % _MH_PRIME for h in hashes) for a, b in _MH_PARAMS]
+
+
+def merge_cross_platform(markets):
+    """
+    Fold near-duplicate questions listed on different platforms into one
+    record. The survivor is the higher composite score; each absorbed
+    market is kept under its `also_on` list with its own odds and link.
+    Ties (equal similarity, equal score) break on (platform, ticker),
+    never on input or set order, so the same markets always merge the
+    same way.
+    """
+    info, buckets = [], {}
+    for i, m in enumerate(markets):
+        words = _dup_words(m.get("title", ""))
+        info.append((words, _dup_anchors(words)))
+        if not words:
+            continue
+        sig = _minhash(words)
+        for b in range(DUP_BANDS):
+            band = tuple(sig[b * DUP_ROWS:(b + 1) * DUP_ROWS])
+            buckets.setdefault((b, band), []).append(i)
+
+    candidates = set()
+    for idxs in buckets.values():
+        if 1 < len(idxs) <= DUP_BUCKET_CAP:
+            for a, b in combinations(idxs, 2):
+                if markets[a]["platform"] != markets[b]["platform"]:
+                    candidates.add((a, b))
+
+    def ident(i):
+        return markets[i]["platform"], str(markets[i].get("ticker", ""))
+
+    pairs = []
+    for a, b in candidates:
+        (wa, ka), (wb, kb) = info[a], info[b]
+        if ka != kb:
+            continue
+        j = len(wa & wb) / len(wa | wb)
+        if j >= DUP_JACCARD:
+            pairs.append((-j, min(ident(a), ident(b)), max(ident(a), ident(b)), a, b))
+
+    # Best matches first; each market joins at most one merge.
+    merged_into, absorbed = {}, set()
+    for *_, a, b in sorted(pairs):
+        if a in absorbed or b in absorbed or a in merged_into or b in merged_into:
+            continue
+        keep, drop = sorted((a, b), key=lambda i: (-composite_score(markets[i]), ident(i)))
+        merged_into[keep] = drop
+        absorbed.add(drop)
+
+    result = []
+    for i, m in enumerate(markets):
+        if i in absorbed:
+            continue
+        if i in merged_into:
+            o = markets[merged_into[i]]
+            m["also_on"] = [{k: o.get(k) for k in
+                             ("platform", "ticker", "title", "yes", "no", "volume_24h", "url")}]
+        result.append(m)
+
+    print(f"  Cross-platform: {len(candidates)} LSH candidates, {len(merged_into)} merged")
+    return result
+
+
+# ================================================================
+# 11. SCORING CACHE  (v11 NEW)
+# ================================================================
+
+SCORE_CACHE_PATH = "data/markets-score-cache.json"
+SCORE_CACHE_DAYS = 21
+SCORE_CACHE_TOUCH_DAYS = 7   # move an entry's last-seen day at most this often
+
+# Bump by hand when the scoring *logic* changes; edits to the tables
+# below change KEYWORD_VERSION on their own.
+SCORER_REVISION = 1
+
+KEYWORD_VERSION = hashlib.sha1(json.dumps([
+    SCORER_REVISION, MIN_RELEVANCE,
+    TIER1_KEYWORDS, TIER2_KEYWORDS, TIER3_KEYWORDS, KALSHI_TICKER_HINTS,
+    MEME_BLACKLIST, SPORTS_BLACKLIST, SPORTS_PLAYER_RE, KALSHI_JUNK_RE,
+    AG_CATEGORIES, _LADDER_RE.pattern,
+], sort_keys=True).encode()).hexdigest()[:12]
+
+
+class ScoreCache:
+    """
+    {key: [day, score, tier, category, family, strike]} for every market
+    at or above MIN_RELEVANCE, and just [day, score] for the rest (junk
+    is score -1); callers drop those, so nothing else is needed. `day` is
+    the last run that saw it (ordinal date, refreshed every
+    SCORE_CACHE_TOUCH_DAYS) and drives pruning. With no path it is
+    in-memory only.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.today = datetime.now(timezone.utc).date().toordinal()
+        self.entries = {}
+        self.hits = self.misses = self.junk = 0
+        if not path:
+            return
+        try:
+            with open(path) as f:
+                raw = json.load(f)
+            if raw.get("version") == KEYWORD_VERSION:
+                self.entries = raw.get("entries", {})
+        except Exception:
+            pass
+
+    @staticmethod
+    def key(ticker, *fields):
+        return hashlib.sha1("\x1f".join((KEYWORD_VERSION, ticker) + fields).encode()).hexdigest()[:16]
+
+    def classify(self, key, ticker, junk_text, score_text, category_text, title):
+        """(score, tier, category, ladder) for one market; score is -1 for junk."""
+        if ticker and _KALSHI_JUNK.search(ticker.upper()):
+            self.junk += 1   # one regex beats a hash + lookup, and keeps the cache small
+            return -1, 0, None, (None, None)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            if self.today - entry[0] >= SCORE_CACHE_TOUCH_DAYS:
+                entry[0] = self.today
+            if len(entry) == 2:
+                return entry[1], 0, None, (None, None)
+            _, score, tier, category, family, strike = entry
+            return score, tier, category, (family, strike)
+
+        self.misses += 1
+        score, tier = (-1, 0) if is_junk(junk_text, ticker) else score_relevance(score_text, ticker=ticker)
+        if score < MIN_RELEVANCE:
+            self.entries[key] = [self.today, score]
+            return score, 0, None, (None, None)
+        category = get_category(category_text)
+        family, strike = _ladder_family(title)
+        self.entries[key] = [self.today, score, tier, category, family, strike]
+        return score, tier, category, (family, strike)
+
+    def save(self):
+        if not self.path:
+            return
+        cutoff = self.today - SCORE_CACHE_DAYS
+        kept = {k: v for k, v in self.entries.items() if v[0] >= cutoff}
+        pruned = len(self.entries) - len(kept)
+        relevant = sum(len(v) > 2 for v in kept.values())
+        # one entry per line, sorted, so a run's git diff touches only the
+        # markets that came, went or were re-stamped
+        lines = ",\n".join(f"{json.dumps(k)}:{json.dumps(v, separators=(',', ':'))}"
+                           for k, v in sorted(kept.items()))
+        with open(self.path, "w") as f:
+            f.write(f'{{"version":{json.dumps(KEYWORD_VERSION)},"entries":{{\n{lines}\n}}}}\n')
+        print(f"  Score cache: {self.hits} cached, {self.misses} scored, {self.junk} junk tickers "
+              f"skipped, {pruned} pruned, {len(kept)} saved ({relevant} relevant, keywords {KEYWORD_VERSION})")
+
+
+SCORE_CACHE = ScoreCache()   # main() swaps in the persisted one
+
+
+# ================================================================
+# 12. COMPOSITE SCORING  (v10 rebalanced)
 # ================================================================
 
 def composite_score(m):
@@ -984,7 +1661,7 @@ def composite_score(m):
 
 
 # ================================================================
-# 11. CATEGORY QUOTAS  (v10 NEW — forces diversity)
+# 13. CATEGORY QUOTAS  (v10 NEW — forces diversity)
 # ================================================================
 
 # Per-category caps for final output. Order matters: categories listed first
@@ -999,6 +1676,7 @@ CATEGORY_QUOTAS = [
     ("Other",             2),
 ]
 TARGET_TOTAL = 20
+MOVERS_TOP = 5
 
 
 def apply_quotas(markets):
@@ -1049,13 +1727,165 @@ def apply_quotas(markets):
 
 
 # ================================================================
-# 12. MAIN
+# 14. ODDS HISTORY + REFRESH MODE  (v11 NEW)
+# ================================================================
+
+def record_odds(top, now):
+    """
+    Append the selection's odds to the history store, set change_24h /
+    change_7d on each market and return (history, movers). The caller
+    saves history after markets.json is written.
+    """
+    print("\n[history] recording odds...")
+    history = odds_history.load()
+    minute = int(now.timestamp() // 60)
+    for m in top:
+        key = f"{m['platform']}:{m['ticker']}"
+        odds_history.append(history, key, minute, m["yes"], m.get("volume_24h", 0))
+        m["change_24h"] = odds_history.change(history[key], 24)
+        m["change_7d"] = odds_history.change(history[key], 24 * 7)
+    expired = odds_history.prune(history, minute)
+    movers = {}
+    for window in ("24h", "7d"):
+        moved = [m for m in top if m[f"change_{window}"]]
+        moved.sort(key=lambda m: -abs(m[f"change_{window}"]))
+        movers[window] = [{"platform": m["platform"], "ticker": m["ticker"], "title": m["title"],
+                           "yes": m["yes"], "change": m[f"change_{window}"], "url": m["url"]}
+                          for m in moved[:MOVERS_TOP]]
+    print(f"  {len(history)} series tracked, {expired} expired; "
+          f"{sum(m['change_24h'] is not None for m in top)} with 24h history, "
+          f"{sum(m['change_7d'] is not None for m in top)} with 7d")
+    return history, movers
+
+
+def group_categories(top):
+    cats = {}
+    for m in top:
+        cats.setdefault(m["category"], []).append(m)
+    return cats
+
+
+def _reprice(rec, prob, vol, close_time, tl):
+    """Update one saved market (or also_on entry) in place."""
+    rec["yes"], rec["no"] = prob, 100 - prob
+    rec["volume_24h"] = vol
+    if "time_left" in rec:
+        rec["time_left"] = tl
+        rec["why_it_matters"] = get_why(rec["title"], prob, tl, close_time)
+
+
+def refresh(path="data/markets.json"):
+    """
+    Re-price the previous selection in place: batched lookups for its
+    Kalshi tickers and Polymarket ids (also_on entries included), then
+    the odds history / movers update. Returns False when there is no
+    previous selection to refresh.
+    """
+    now = datetime.now(timezone.utc)
+    print(f"\nAGSIST fetch_markets.py v11 --refresh -- {now.strftime('%Y-%m-%d %H:%M UTC')}")
+    print("=" * 60)
+    try:
+        with open(path) as f:
+            output = json.load(f)
+    except Exception as e:
+        print(f"  ERROR: no previous selection ({e}) -- run a full fetch first")
+        return False
+    top = output.get("markets", [])
+
+    recs = {}   # (platform, id) -> saved records (top-level and also_on)
+    for m in top:
+        for rec in [m] + m.get("also_on", []):
+            recs.setdefault((rec["platform"], rec["ticker"]), []).append(rec)
+    kalshi_ids = sorted(t for p, t in recs if p == "Kalshi")
+    poly_ids = sorted(t for p, t in recs if p == "Polymarket")
+
+    fresh = {}
+    for i in range(0, len(kalshi_ids), KALSHI_TICKER_CHUNK):
+        chunk = kalshi_ids[i:i + KALSHI_TICKER_CHUNK]
+        data, _ = kalshi_get(f"{KALSHI_BASE}/markets?limit={len(chunk)}"
+                             f"&tickers={url_quote(','.join(chunk), safe=',')}")
+        for m in (data or {}).get("markets", []):
+            fresh[("Kalshi", m.get("ticker"))] = (_parse_kalshi_prob(m), _parse_kalshi_volume(m),
+                                                  m.get("close_time") or m.get("expiration_time") or "")
+    if poly_ids:
+        data = poly_get(f"{POLY_BASE}/markets?limit={len(poly_ids)}&"
+                        + "&".join(f"id={url_quote(i)}" for i in poly_ids))
+        items = data if isinstance(data, list) else (data or {}).get("results", (data or {}).get("markets", []))
+        for m in items or []:
+            mid = str(m.get("id") or m.get("condition_id") or m.get("conditionId") or "")[:20]
+            fresh[("Polymarket", mid)] = (_parse_poly_prob(m), _parse_poly_volume(m),
+                                          m.get("endDate") or m.get("end_date_iso") or m.get("endDateIso") or "")
+
+    updated = stale = 0
+    closed = set()
+    for key, rs in recs.items():
+        if key not in fresh:
+            stale += 1      # not returned: keep the last odds
+            continue
+        prob, vol, close_time = fresh[key]
+        close_time = close_time or rs[0].get("close_time", "")
+        tl = time_remaining(close_time)
+        if tl == "Closed":
+            closed.add(key)
+            continue
+        if prob is None:
+            stale += 1      # no usable price (settling at 0/100?): keep the last odds
+            continue
+        for rec in rs:
+            _reprice(rec, prob, vol, close_time, tl)
+        updated += 1
+
+    kept = []
+    for m in top:
+        if (m["platform"], m["ticker"]) in closed:
+            continue
+        if m.get("also_on"):
+            m["also_on"] = [o for o in m["also_on"] if (o["platform"], o["ticker"]) not in closed]
+            if not m["also_on"]:
+                del m["also_on"]
+        kept.append(m)
+
+    history, movers = record_odds(kept, now)
+    output.update({
+        "fetched":    now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "count":      len(kept),
+        "movers":     movers,
+        "categories": group_categories(kept),
+        "markets":    kept,
+    })
+    with open(path, "w") as f:
+        json.dump(output, f, indent=2)
+    odds_history.save(history)
+
+    print(f"\n{'=' * 60}")
+    print(f"OK {path} refreshed -- {updated} re-priced, {stale} unchanged, "
+          f"{len(top) - len(kept)} closed and dropped, {len(kept)} kept")
+    print(f"  HTTP:")
+    HTTP.report()
+    print(f"{'=' * 60}\nDone.\n")
+    return True
+
+
+# ================================================================
+# 15. MAIN
 # ================================================================
 
 def main():
+    global SCORE_CACHE
+    parser = argparse.ArgumentParser(description="AGSIST prediction-market fetcher")
+    parser.add_argument("--refresh", action="store_true",
+                        help="only re-price the markets already in data/markets.json "
+                             "(no discovery, scoring or quotas)")
+    args = parser.parse_args()
+    if args.refresh:
+        if not refresh():
+            raise SystemExit(1)
+        return
+
     now = datetime.now(timezone.utc)
-    print(f"\nAGSIST fetch_markets.py v10 -- {now.strftime('%Y-%m-%d %H:%M UTC')}")
+    print(f"\nAGSIST fetch_markets.py v11 -- {now.strftime('%Y-%m-%d %H:%M UTC')}")
     print("=" * 60)
+    SCORE_CACHE = ScoreCache(SCORE_CACHE_PATH)
 
     kalshi = fetch_kalshi()
     poly = fetch_polymarket()
@@ -1067,23 +1897,27 @@ def main():
     collapsed = collapse_ladders(combined, max_per_family=2)
     print(f"  {len(combined)} -> {len(collapsed)} after ladder dedup")
 
+    # v11: same question on both platforms -> one record with both odds
+    merged = merge_cross_platform(collapsed)
+    print(f"  {len(collapsed)} -> {len(merged)} after cross-platform dedup")
+
     # Title-normalized dedup (v9 behavior) as second pass
     deduped, seen_titles = [], set()
-    for m in sorted(collapsed, key=composite_score, reverse=True):
+    for m in sorted(merged, key=composite_score, reverse=True):
         norm = re.sub(r"[^a-z0-9 ]", "", m["title"].lower()).strip()
         if norm not in seen_titles:
             seen_titles.add(norm)
             deduped.append(m)
-    print(f"  {len(collapsed)} -> {len(deduped)} after title dedup")
+    print(f"  {len(merged)} -> {len(deduped)} after title dedup")
 
     # v10: Apply category quotas
     print("\n[quotas] applying category caps...")
     top = apply_quotas(deduped)
     print(f"  Final selection: {len(top)} markets")
 
-    cats = {}
-    for m in top:
-        cats.setdefault(m["category"], []).append(m)
+    # v11: record the selection's odds and read 24h / 7d change back out
+    history, movers = record_odds(top, now)
+    cats = group_categories(top)
 
     tc = {100: 0, 70: 0, 40: 0}
     for m in combined:
@@ -1102,6 +1936,7 @@ def main():
             "trade_energy":  tc[70],
             "macro_weather": tc[40],
         },
+        "movers":     movers,
         "categories": cats,
         "markets":    top,
     }
@@ -1109,16 +1944,24 @@ def main():
     os.makedirs("data", exist_ok=True)
     with open("data/markets.json", "w") as f:
         json.dump(output, f, indent=2)
+    SCORE_CACHE.save()
+    odds_history.save(history)
 
     print(f"\n{'=' * 60}")
-    print(f"OK data/markets.json written -- v10")
+    print(f"OK data/markets.json written -- v11")
     print(f"  Kalshi:      {len(kalshi)}")
     print(f"  Polymarket:  {len(poly)}")
     print(f"  After ladders: {len(collapsed)}")
+    print(f"  Cross-merged:  {len(collapsed) - len(merged)}")
     print(f"  Deduped:     {len(deduped)}")
     print(f"  Top saved:   {len(top)}")
     print(f"  Direct ag:   {tc[100]}  Trade/energy: {tc[70]}  Macro: {tc[40]}")
     print(f"  Categories:  " + ", ".join(f"{k}({len(v)})" for k, v in cats.items()))
+    print(f"  HTTP:")
+    HTTP.report()
+    for window, ms in movers.items():
+        if ms:
+            print(f"  Movers {window:3s}:  " + ", ".join(f"{m['title'][:30]} {m['change']:+d}" for m in ms[:3]))
     if top:
         print(f"\n  Top 10:")
         for i, m in enumerate(top[:10], 1):
@@ -4,6 +4,114 @@ fetch_prices.py — fetches commodity/futures/index/crypto prices via yfinance
 Writes to data/prices.json. Run by GitHub Actions every 30min on weekdays.
 All free, no API key needed.
 
+v3.2 — 2026-10-17
+  Contract calendar. The grain aliases and forward curve in SYMBOLS are
+  now built at startup by cbot_contracts.py from the H/K/N/U/Z (plus
+  F/Q/X for beans) month codes and the CBOT last-trading-day rule.
+  Expired contracts are never requested, corn-dec / beans-nov roll
+  together to the next crop year (mid-October, with Nov beans), their
+  history and stats live under the dated contract key so a roll never
+  splices two contracts into one series, and the annual audit below
+  is retired. Keys for dead contracts drop out of prices.json instead
+  of being KEPT forever.
+
+  Batched fetch. The default mode now pulls every ticker in one
+  yf.download() call (1y of daily bars: live close, previous close and
+  52-week range in one response) and only falls back to the per-ticker
+  fast_info/history path for tickers the batch missed. The serial v3
+  loop is still available with --mode serial.
+
+  Bounded-concurrency fetch. Per-ticker requests (all of them in
+  --mode concurrent, the batch misses in --mode batch) now run on a
+  thread pool (--workers) with a per-ticker timeout (--ticker-timeout)
+  and a hard deadline for the whole phase (--deadline). Anything that
+  misses either budget goes through the usual KEPT-previous-value path.
+  The run summary prints p50/p95 per-ticker latency for pool tuning.
+  Pool threads can't be killed and the interpreter joins them at exit,
+  so once everything is written a run with requests still in flight
+  leaves through os._exit() instead of waiting for them.
+
+  Price history. Every fresh quote is folded into a daily OHLC bar in
+  data/history/<key>.csv (price_history.py). KEPT values are never
+  written, so the store only ever holds prices Yahoo actually returned.
+
+  Intraday series. data/prices-intraday.json carries the last 48
+  half-hourly prints per symbol as flat arrays aligned to one shared
+  timestamp array, so a sparkline needs one small request and no
+  upstream calls.
+
+  Derived block. prices.json now carries `derived`: corn/bean ratio,
+  board crush, oil share and the cattle feeding margin, each with
+  value, prior value and change, computed once per run from
+  DERIVED_METRICS instead of on every page view.
+
+  Curves block. prices.json `curves` carries, per grain, the contracts
+  in expiry order (key, label, expiry, price, change), adjacent calendar
+  spreads with annualized carry, and a contango/backwardation flag, so
+  the futures pages draw the forward curve without parsing key names.
+
+  Rolling stats. price_stats.py keeps 52-week hi/lo, 20/50-day means,
+  20-day realized vol and percentile rank per symbol, updated
+  incrementally (O(window) per finished session) from the history
+  store. Fresh quotes carry them as `stats`; once a
+  symbol has 200 sessions of local history its wk52 range comes from
+  there and the fast_info year_high/year_low lookups (a hidden 1y
+  history request each) are skipped. The same state carries an EWMA of
+  daily return variance, published as stats.sigma_1d for generate_daily's
+  z-score surprise detection.
+
+  Spike screen. Before anything is stored, every fresh quote's close
+  and previous close are scored against a rolling median/MAD of the
+  symbol's last 20 history bars (one NumPy pass over all symbols). A
+  bad print is quarantined — listed under `quarantined` in prices.json
+  and replaced by the last good value via the KEPT path — so it never
+  reaches history, locked_prices or surprise detection. A print that
+  repeats on the next fresh quote is accepted as a genuine level shift;
+  a pending quarantine is carried forward until that quote arrives, even
+  across runs where the session scheduler skips the symbol.
+  tests/test_fetch_prices.py covers the quarantine-then-confirm path.
+
+  Delta feed. prices.json is only rewritten when its content changes
+  (the `fetched` stamp alone doesn't count), and every write bumps a
+  `seq` counter and publishes data/prices.delta.json: just the quotes
+  and blocks that differ from the previous seq. geo.js polls the small
+  delta and patches the prices it already holds, falling back to the
+  full file when it has missed a seq.
+
+  Session scheduler. The cron still fires every 30 minutes, but each
+  run only fetches the asset classes whose exchange is in session
+  (market_sessions.py): crypto every run, CBOT grains and CME Globex
+  in their sessions (thin overnight hours polled hourly), livestock in
+  the day session, the S&P 500 and 10-year yield in NYSE hours, and
+  every class for an hour after its close to catch the settle. Idle
+  symbols keep their last quote without counting as failures. --all
+  fetches everything.
+
+  Backfill. `fetch_prices.py backfill --since 2015` seeds the history
+  store with multi-year daily bars for every key in SYMBOLS via bulk
+  yf.download() calls. It only requests what is missing (before a
+  symbol's first bar, after its last), checkpoints per chunk in
+  data/history/.backfill.json so it can be rerun or resumed freely,
+  and rebuilds price_stats for every symbol it extended.
+
+  Record / replay. Upstream calls go through a pluggable backend
+  (quote_backend.py). --record PATH captures every fast_info field,
+  history() frame and bulk download, with timings, to a JSON cassette;
+  --replay PATH serves one offline with recorded, fixed or per-ticker
+  latency and injected failures. `fetch_prices.py bench --replay PATH`
+  times serial, concurrent and batch against the same cassette.
+
+  Hedged requests. Per-ticker fetches that have no usable answer from
+  yfinance within --hedge-after seconds (or come back NaN) are also
+  sent to a secondary source — Yahoo's v8 chart endpoint over urllib
+  (quote_backend.ChartSource) — and the first valid answer wins (logged
+  as HEDG). --secondary-url points it elsewhere, e.g. at the local
+  stand-in `quote_backend.py serve`. --secondary none turns it off.
+  The hedge pool is sized from --workers and shut down without waiting
+  once the fetch phase ends. The secondary only routes around yfinance
+  (its session, quoteSummary calls and NaN fields): it is still Yahoo,
+  so when Yahoo itself is slow both sources are slow together.
+
 v3.1 — 2026-04-26 (afternoon)
   yfinance fast_info can return float('nan') for missing fields
   (e.g. previous_close on a thin-volume crypto). The old `... or ...`
@@ -52,11 +160,22 @@ v2 — 2026-03-24
   Added wk52_hi / wk52_lo from fast_info.year_high / year_low.
 """
 
+import argparse
 import json
 import math
+import os
 import sys
-from datetime import datetime, timezone
-import yfinance as yf
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+
+import cbot_contracts
+import market_sessions
+import price_history
+import price_stats
+import quote_backend
 
 
 def _num(v):
@@ -78,39 +197,16 @@ def _num(v):
 
 # Map our internal keys → Yahoo Finance ticker symbols
 SYMBOLS = {
-    # ── Grains: front month + new-crop benchmark aliases ──
+    # ── Grains: continuous front month ──
     "corn":       "ZC=F",
-    "corn-dec":   "ZCZ26.CBT",     # Dec 2026 — current new-crop benchmark; used by corn-bean ratio
     "beans":      "ZS=F",
-    "beans-nov":  "ZSX26.CBT",     # Nov 2026 — current new-crop benchmark; used by corn-bean ratio
     "wheat":      "ZW=F",
     "oats":       "ZO=F",
 
-    # ── Grain forward curve (year-explicit; UPDATE ANNUALLY) ──
-    # Corn active months: Mar (H), May (K), Jul (N), Sep (U), Dec (Z)
-    "corn-jul26": "ZCN26.CBT",
-    "corn-sep26": "ZCU26.CBT",
-    "corn-mar27": "ZCH27.CBT",
-    "corn-may27": "ZCK27.CBT",
-    "corn-jul27": "ZCN27.CBT",
-    "corn-dec27": "ZCZ27.CBT",
-
-    # Beans active months: Jan (F), Mar (H), May (K), Jul (N), Aug (Q), Sep (U), Nov (X)
-    "beans-jul26":"ZSN26.CBT",
-    "beans-aug26":"ZSQ26.CBT",
-    "beans-sep26":"ZSU26.CBT",
-    "beans-jan27":"ZSF27.CBT",
-    "beans-mar27":"ZSH27.CBT",
-    "beans-jul27":"ZSN27.CBT",
-    "beans-nov27":"ZSX27.CBT",
-
-    # Wheat active months: Mar (H), May (K), Jul (N), Sep (U), Dec (Z)
-    "wheat-jul26":"ZWN26.CBT",
-    "wheat-sep26":"ZWU26.CBT",
-    "wheat-dec26":"ZWZ26.CBT",
-    "wheat-mar27":"ZWH27.CBT",
-    "wheat-jul27":"ZWN27.CBT",
-    "wheat-dec27":"ZWZ27.CBT",
+    # ── Grain new-crop aliases (corn-dec, beans-nov) + forward curve ──
+    # Generated from the CBOT month codes and expiry calendar: only live
+    # contracts, aliases rolled automatically. See cbot_contracts.py.
+    **cbot_contracts.active_symbols(),
 
     # ── Livestock ──
     "cattle":     "LE=F",
@@ -136,10 +232,152 @@ SYMBOLS = {
     "kaspa":      "KAS-USD",
 }
 
+# History and rolling stats for the new-crop aliases are stored under the
+# dated contract they point at (corn-dec → corn-dec27), so an alias roll
+# switches series instead of splicing two contracts together.
+HISTORY_KEYS = cbot_contracts.alias_history_keys()
+
+
+def history_key(key):
+    """The data/history/ and price-stats key that holds `key`'s series."""
+    return HISTORY_KEYS.get(key, key)
+
+# Intraday ring: the last INTRADAY_POINTS half-hourly prints per symbol
+# (48 = one day at the */30 cron), published as data/prices-intraday.json.
+INTRADAY_PATH   = "data/prices-intraday.json"
+INTRADAY_POINTS = 48
+
+# `backfill` mode: tickers per bulk download, and the record of how far
+# back each symbol has already been requested (so a rerun never re-asks
+# Yahoo for years before a contract listed).
+BACKFILL_CHUNK = 20
+BACKFILL_STATE = "data/history/.backfill.json"
+
+# prices.json is rewritten only when its content changes; each change bumps
+# `seq` and publishes the diff against the previous seq here.
+PRICES_PATH = "data/prices.json"
+DELTA_PATH  = "data/prices.delta.json"
+
+# Derived relationships, computed once per run into the `derived` block.
+# Each entry: name → (inputs, unit, fn). fn receives the inputs' prices in
+# prices.json units (grains ¢/bu, meal $/short ton, soyoil ¢/lb, cattle
+# $/cwt) in the order listed.
+def _crush_parts(meal, soyoil):
+    # One bushel of beans crushes to ~44 lb meal and ~11 lb oil.
+    return meal / 2000 * 44, soyoil / 100 * 11
+
+DERIVED_METRICS = {
+    # Nov beans ÷ Dec corn — the new-crop planting signal on the futures pages.
+    "corn_bean_ratio": (("beans-nov", "corn-dec"), "ratio",
+                        lambda b, c: b / c),
+    # Board crush margin, $/bu: meal + oil value per bushel minus bean cost.
+    "board_crush":     (("meal", "soyoil", "beans"), "$/bu",
+                        lambda m, o, b: sum(_crush_parts(m, o)) - b / 100),
+    # Oil's share of crush product value, %.
+    "oil_share":       (("meal", "soyoil"), "%",
+                        lambda m, o: _crush_parts(m, o)[1] / sum(_crush_parts(m, o)) * 100),
+    # Cattle crush, $/head: 1,250 lb fed steer out, 750 lb feeder and
+    # 50 bu of corn in. Ignores yardage, interest and death loss.
+    "cattle_feeding_margin": (("cattle", "feeders", "corn"), "$/head",
+                              lambda lc, fc, c: lc * 12.5 - fc * 7.5 - c / 100 * 50),
+}
+
+# 24/7 markets. Everything else only gets a history bar on weekdays, so a
+# Saturday run replaying Friday's settle doesn't invent a weekend bar.
+CRYPTO_KEYS = {"bitcoin", "ripple", "kaspa"}
 
-def fetch_quote(key, ticker):
+# Session class per symbol for the run scheduler (market_sessions.py).
+# Anything not listed — front months, aliases, curve contracts, meal and
+# soyoil — trades CBOT grain hours.
+SESSION_CLASS = {
+    "cattle": "livestock", "feeders": "livestock", "hogs": "livestock",
+    "milk": "globex", "crude": "globex", "natgas": "globex",
+    "gold": "globex", "silver": "globex", "dollar": "globex",
+    "treasury10": "nyse", "sp500": "nyse",
+    **{k: "crypto" for k in CRYPTO_KEYS},
+}
+
+
+def session_class(key):
+    return SESSION_CLASS.get(key, "grains")
+
+# Batch mode pulls this much daily history per ticker in one bulk request —
+# enough for the 52-week range, so no per-ticker fast_info lookups needed.
+# Once every symbol's range comes from price_stats, a few days is plenty.
+BATCH_PERIOD = "1y"
+BATCH_PERIOD_SHORT = "5d"
+
+# Per-ticker fetch pool. Yahoo is happy with a handful of parallel requests;
+# tune FETCH_WORKERS against the p50/p95 latency line in the run summary.
+FETCH_WORKERS  = 8
+TICKER_TIMEOUT = 20     # seconds one ticker may take before it is abandoned
+RUN_DEADLINE   = 180    # seconds for the whole per-ticker phase
+
+# Where quotes come from (quote_backend.py). main() swaps in a recorder or
+# a replay of a recorded cassette when --record / --replay is given.
+BACKEND = None
+
+# Hedged requests. When SECONDARY is set (quote_backend.ChartSource — main()
+# wires it from --secondary), a per-ticker fetch that has no usable answer
+# from BACKEND after HEDGE_AFTER seconds is also sent to SECONDARY, and the
+# first valid answer wins. Set HEDGE_AFTER near the primary's p95 so only
+# the slow tail pays for a second request.
+SECONDARY   = None
+HEDGE_AFTER = 4.0
+HEDGE_STATS = {"fired": 0, "won": 0}
+_HEDGE_POOL = None
+_HEDGE_LOCK = threading.Lock()
+
+# Spike screen. Each fresh close and previous close is scored against the
+# median / MAD of the symbol's last SPIKE_WINDOW history bars; a robust
+# z-score above SPIKE_Z quarantines the quote. The MAD is floored at
+# SPIKE_FLOOR_PCT of the median so a flat series can't make a normal tick
+# look like a spike. A quarantined print that comes back within
+# SPIKE_CONFIRM_PCT on the symbol's next fresh quote is taken as a real
+# level shift (front-month roll, limit move) and accepted.
+SPIKE_WINDOW      = 20
+SPIKE_MIN_BARS    = 5
+SPIKE_Z           = 8.0
+SPIKE_FLOOR_PCT   = 0.01
+SPIKE_CONFIRM_PCT = 0.02
+
+
+def _finish_quote(key, ticker, close, prev, wk52_hi, wk52_lo, src="OK"):
+    """Round, log and package one quote. `close` must already be non-None."""
+    # If we have close but no prev, treat as flat day so net/pct = 0.
+    if prev is None:
+        prev = close
+
+    close   = round(close, 5)
+    prev    = round(prev, 5)
+    net     = round(close - prev, 5)
+    pct     = round((net / prev * 100) if prev else 0, 4)
+    wk52_hi = round(wk52_hi, 4) if wk52_hi is not None else None
+    wk52_lo = round(wk52_lo, 4) if wk52_lo is not None else None
+
+    range_str = f"  52wk: {wk52_lo}–{wk52_hi}" if wk52_hi and wk52_lo else "  52wk: n/a"
+    print(f"  {src:4s} {key:14s} ({ticker:14s})  {close:>12.4f}  {net:+.4f}  {pct:+.2f}%{range_str}")
+
+    return {
+        "ticker":    ticker,
+        "close":     close,
+        "open":      prev,
+        "netChange": net,
+        "pctChange": pct,
+        "wk52_hi":   wk52_hi,
+        "wk52_lo":   wk52_lo,
+    }
+
+
+def _primary_quote(key, ticker, need_range=True):
+    """
+    One ticker via fast_info (history() fallback). With need_range=False
+    the year_high / year_low lookups are skipped — on fast_info those cost
+    a full 1y history request — because price_stats supplies the range.
+    Returns {"close", "prev", "wk52_hi", "wk52_lo"} or None.
+    """
     try:
-        t = yf.Ticker(ticker)
+        t = BACKEND.ticker(ticker)
         info = t.fast_info
 
         # _num() short-circuits None/NaN/inf to None so downstream math
@@ -152,8 +390,10 @@ def fetch_quote(key, ticker):
         if prev is None:
             prev = _num(getattr(info, 'regular_market_previous_close', None))
         # 52-week range — available on fast_info, no slow .info() call needed
-        wk52_hi = _num(getattr(info, 'year_high', None))
-        wk52_lo = _num(getattr(info, 'year_low', None))
+        wk52_hi = wk52_lo = None
+        if need_range:
+            wk52_hi = _num(getattr(info, 'year_high', None))
+            wk52_lo = _num(getattr(info, 'year_low', None))
 
         if close is None:
             # fallback: last 2 days of history
@@ -167,79 +407,875 @@ def fetch_quote(key, ticker):
             print(f"  SKIP {key} ({ticker}) — no price data")
             return None
 
-        # If we have close but no prev, treat as flat day so net/pct = 0.
-        if prev is None:
-            prev = close
-
-        close   = round(close, 5)
-        prev    = round(prev, 5)
-        net     = round(close - prev, 5)
-        pct     = round((net / prev * 100) if prev else 0, 4)
-        wk52_hi = round(wk52_hi, 4) if wk52_hi is not None else None
-        wk52_lo = round(wk52_lo, 4) if wk52_lo is not None else None
-
-        range_str = f"  52wk: {wk52_lo}–{wk52_hi}" if wk52_hi and wk52_lo else "  52wk: n/a"
-        print(f"  OK   {key:14s} ({ticker:14s})  {close:>12.4f}  {net:+.4f}  {pct:+.2f}%{range_str}")
-
-        return {
-            "ticker":    ticker,
-            "close":     close,
-            "open":      prev,
-            "netChange": net,
-            "pctChange": pct,
-            "wk52_hi":   wk52_hi,
-            "wk52_lo":   wk52_lo,
-        }
+        return {"close": close, "prev": prev, "wk52_hi": wk52_hi, "wk52_lo": wk52_lo}
     except Exception as e:
         print(f"  ERR  {key} ({ticker}): {e}")
         return None
 
 
+def _secondary_quote(key, ticker, need_range=True):
+    """The same answer from SECONDARY, sanitized like the primary. None on failure."""
+    try:
+        got = SECONDARY.quote(ticker)
+    except Exception as e:
+        print(f"  ERR2 {key} ({ticker}) {SECONDARY.name}: {e}")
+        return None
+    got = {k: _num(got.get(k)) for k in ("close", "prev", "wk52_hi", "wk52_lo")}
+    if got["close"] is None:
+        return None
+    if not need_range:
+        got["wk52_hi"] = got["wk52_lo"] = None
+    return got
+
+
+def _hedge_pool(workers=FETCH_WORKERS):
+    """
+    The shared pool _hedged_quote() runs primaries and hedges on, created
+    on first use. Sized per fetch worker for one primary, one hedge and
+    one primary its caller already gave up on (a timed-out request keeps
+    its slot until Yahoo answers), so hedges don't queue behind those.
+    """
+    global _HEDGE_POOL
+    with _HEDGE_LOCK:
+        if _HEDGE_POOL is None:
+            _HEDGE_POOL = ThreadPoolExecutor(max_workers=3 * max(1, workers))
+        return _HEDGE_POOL
+
+
+def _close_hedge_pool():
+    """Drop the hedge pool without waiting on stragglers (see fetch_concurrent)."""
+    global _HEDGE_POOL
+    with _HEDGE_LOCK:
+        pool, _HEDGE_POOL = _HEDGE_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _hedged_quote(key, ticker, need_range=True):
+    """
+    Give the primary HEDGE_AFTER seconds; if it hasn't produced a usable
+    quote by then (or fails sooner), ask SECONDARY too and take whichever
+    valid answer lands first. Returns (quote dict or None, src tag).
+    """
+    pool = _hedge_pool()
+    primary = pool.submit(_primary_quote, key, ticker, need_range)
+    done, _ = wait([primary], timeout=HEDGE_AFTER)
+    if done and primary.result():
+        return primary.result(), "OK"
+
+    try:
+        secondary = pool.submit(_secondary_quote, key, ticker, need_range)
+    except RuntimeError:
+        return None, None   # the pool was shut down: the fetch phase is over
+    with _HEDGE_LOCK:
+        HEDGE_STATS["fired"] += 1
+    pending = {secondary} if done else {primary, secondary}
+    while pending:
+        finished, pending = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+        for fut in finished:
+            got = fut.result()
+            if got:
+                if fut is secondary:
+                    with _HEDGE_LOCK:
+                        HEDGE_STATS["won"] += 1
+                return got, "OK" if fut is primary else "HEDG"
+        # shutdown(cancel_futures=True) never wakes wait() on the futures
+        # it cancels, so look for them rather than block exit forever
+        if any(fut.cancelled() for fut in pending):
+            return None, None
+    return None, None
+
+
+def fetch_quote(key, ticker, need_range=True):
+    """One ticker, hedged against SECONDARY when one is configured."""
+    if SECONDARY is None:
+        got, src = _primary_quote(key, ticker, need_range), "OK"
+    else:
+        got, src = _hedged_quote(key, ticker, need_range)
+    if got is None:
+        return None
+    return _finish_quote(key, ticker, got["close"], got["prev"],
+                         got["wk52_hi"], got["wk52_lo"], src=src)
+
+
+def _column(frame, name):
+    """Pull one OHLC column out of a download frame as clean floats (NaN dropped)."""
+    if frame is None or name not in frame:
+        return []
+    return [f for f in (_num(v) for v in frame[name].tolist()) if f is not None]
+
+
+def fetch_batch(symbols, period=BATCH_PERIOD):
+    """
+    v3.2: one yf.download() call for every ticker instead of a fast_info
+    lookup (plus a history() fallback) per ticker. A 1y daily window gives
+    us the live bar, the previous close AND the 52-week range in the same
+    response, so the batch path needs no per-ticker metadata calls.
+
+    Returns {key: quote}. Keys missing from the result were not covered by
+    the batch (expired contract, thin market, Yahoo hiccup) — the caller
+    retries those one at a time through fetch_quote().
+    """
+    tickers = list(dict.fromkeys(symbols.values()))
+    try:
+        frame = BACKEND.download(tickers, period=period, interval="1d",
+                                 group_by="ticker", auto_adjust=False,
+                                 threads=True, progress=False)
+    except Exception as e:
+        print(f"  ERR  batch download: {e}")
+        return {}
+    if frame is None or len(frame) == 0:
+        print("  ERR  batch download returned no rows")
+        return {}
+
+    multi = getattr(frame.columns, "nlevels", 1) > 1
+    present = set(frame.columns.get_level_values(0)) if multi else set()
+
+    results = {}
+    for key, ticker in symbols.items():
+        try:
+            if multi:
+                bars = frame[ticker] if ticker in present else None
+            else:
+                bars = frame if len(tickers) == 1 else None
+            # Calendars differ across asset classes (crypto trades weekends,
+            # futures don't), so every column is NaN-padded to the union of
+            # dates. _column() strips the padding per ticker.
+            closes = _column(bars, "Close")
+            if not closes:
+                continue
+            highs = _column(bars, "High")
+            lows  = _column(bars, "Low")
+            prev  = closes[-2] if len(closes) >= 2 else None
+            results[key] = _finish_quote(
+                key, ticker, closes[-1], prev,
+                max(highs) if highs else None,
+                min(lows) if lows else None,
+                src="BTCH",
+            )
+        except Exception as e:
+            print(f"  ERR  {key} ({ticker}) batch parse: {e}")
+    return results
+
+
+def fetch_serial(symbols, need_range=None):
+    """The v3 loop: one ticker at a time. Returns (results, latencies).
+
+    need_range: keys that still need the upstream 52-week range (None = all).
+    """
+    results, latencies = {}, {}
+    for key, ticker in symbols.items():
+        t0 = time.monotonic()
+        result = fetch_quote(key, ticker, need_range is None or key in need_range)
+        latencies[key] = time.monotonic() - t0
+        if result:
+            results[key] = result
+    return results, latencies
+
+
+def fetch_concurrent(symbols, workers=FETCH_WORKERS, ticker_timeout=TICKER_TIMEOUT,
+                     deadline=RUN_DEADLINE, need_range=None):
+    """
+    v3.2: bounded thread pool over fetch_quote(). One slow Yahoo response
+    no longer holds up every ticker queued behind it.
+
+    A ticker that runs past `ticker_timeout`, or is still outstanding when
+    `deadline` expires, is simply left out of the results — main() then
+    routes it through the usual KEPT-previous-value path. Abandoned worker
+    threads cannot be killed and would be joined at interpreter exit;
+    main() ends with _exit_run() so they don't hold the process open.
+
+    Returns (results, latencies). Abandoned tickers are reported at the
+    time they had been running when we gave up, so p95 still shows them.
+    """
+    results, latencies, started, abandoned = {}, {}, {}, {}
+
+    def run(key, ticker):
+        started[key] = time.monotonic()
+        result = fetch_quote(key, ticker, need_range is None or key in need_range)
+        latencies[key] = time.monotonic() - started[key]
+        return result
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = {pool.submit(run, key, ticker): key for key, ticker in symbols.items()}
+    pending = set(futures)
+    stop_at = time.monotonic() + deadline
+
+    while pending:
+        now = time.monotonic()
+        if now >= stop_at:
+            break
+        done, pending = wait(pending, timeout=min(1.0, stop_at - now),
+                             return_when=FIRST_COMPLETED)
+        for fut in done:
+            key = futures[fut]
+            try:
+                result = fut.result()
+            except Exception as e:
+                print(f"  ERR  {key}: {e}")
+                continue
+            if result is None:
+                continue
+            if latencies.get(key, 0) > ticker_timeout:
+                print(f"  TIME {key} — answered after {latencies[key]:.1f}s, discarding")
+                continue
+            results[key] = result
+        # Per-ticker budget: give up on anything that has been running too long.
+        now = time.monotonic()
+        for fut in list(pending):
+            key = futures[fut]
+            if key in started and now - started[key] > ticker_timeout:
+                pending.discard(fut)
+                abandoned[key] = now - started[key]
+                print(f"  TIME {key} — no answer within {ticker_timeout:.0f}s")
+
+    now = time.monotonic()
+    for fut in pending:
+        key = futures[fut]
+        if key in started:
+            abandoned[key] = now - started[key]
+        print(f"  LATE {key} — missed the {deadline:.0f}s run deadline")
+    pool.shutdown(wait=False, cancel_futures=True)
+    # Snapshot: abandoned threads may still write into `latencies` later.
+    return results, {**latencies, **abandoned}
+
+
+def _exit_run(code=0):
+    """
+    End the process. ThreadPoolExecutor workers still stuck on an
+    abandoned request are joined at interpreter exit, however the pool
+    was shut down, so when any are left skip that with os._exit() —
+    only called once every output file is written.
+    """
+    stuck = [t for t in threading.enumerate()
+             if t is not threading.main_thread() and not t.daemon and t.is_alive()]
+    if not stuck:
+        sys.exit(code)
+    print(f"  leaving {len(stuck)} request thread(s) still in flight")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def print_latency_summary(latencies):
+    if not latencies:
+        print("  latency: no per-ticker requests this run")
+        return
+    vals = list(latencies.values())
+    slowest = sorted(latencies.items(), key=lambda kv: kv[1], reverse=True)[:3]
+    print(f"  latency: {len(vals)} tickers  p50 {_percentile(vals, 50):.2f}s  "
+          f"p95 {_percentile(vals, 95):.2f}s  max {max(vals):.2f}s  "
+          f"(slowest: {', '.join(f'{k} {v:.2f}s' for k, v in slowest)})")
+
+
+def print_hedge_summary():
+    if SECONDARY is None:
+        return
+    print(f"  hedge: secondary asked for {HEDGE_STATS['fired']} ticker(s) after {HEDGE_AFTER:.1f}s, "
+          f"answered first for {HEDGE_STATS['won']}")
+
+
+def compute_derived(quotes):
+    """
+    Evaluate every DERIVED_METRICS entry on today's closes and on the
+    previous closes (quote["open"]) in one pass, so consumers get value,
+    prior value and change without re-deriving anything client-side.
+    Metrics whose inputs are missing, or that divide by zero, are omitted.
+    """
+    derived = {}
+    for name, (inputs, unit, fn) in DERIVED_METRICS.items():
+        rows = [quotes.get(k) or {} for k in inputs]
+        now  = [_num(r.get("close")) for r in rows]
+        prev = [_num(r.get("open")) for r in rows]
+        if any(v is None for v in now):
+            continue
+        try:
+            value = fn(*now)
+        except ZeroDivisionError:
+            continue
+        try:
+            before = fn(*prev) if all(v is not None for v in prev) else None
+        except ZeroDivisionError:
+            before = None
+        derived[name] = {
+            "value":  round(value, 4),
+            "prev":   round(before, 4) if before is not None else None,
+            "change": round(value - before, 4) if before is not None else None,
+            "unit":   unit,
+            "inputs": list(inputs),
+        }
+    return derived
+
+
+def build_curves(quotes, today=None):
+    """
+    Term structure per grain, ready to draw: contracts in expiry order
+    (new-crop alias included under its alias key), the calendar spread and
+    annualized carry between each adjacent pair, and a structure flag.
+
+    Carry is (deferred / nearby - 1) annualized over the days between the
+    two expiries, in percent. `structure` reads the nearby spread (the one
+    storage decisions hinge on); `inversions` counts every negative spread
+    further out so a mixed curve is still visible.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    key_for = {t: k for k, t in SYMBOLS.items()}
+    curves = {}
+    for commodity in cbot_contracts.COMMODITIES:
+        contracts = []
+        for c in cbot_contracts.curve(commodity, today, include_alias=True):
+            key = key_for.get(c.ticker)
+            q = quotes.get(key) if key else None
+            if not q or q.get("close") is None:
+                continue
+            contracts.append({
+                "key":     key,
+                "ticker":  c.ticker,
+                "label":   cbot_contracts.contract_label(c.ticker),
+                "expiry":  c.expiry.isoformat(),
+                "days":    (c.expiry - today).days,
+                "idx":     (c.year % 100) * 12 + c.month,
+                "price":   q["close"],
+                "change":  q.get("netChange"),
+            })
+        if len(contracts) < 2:
+            continue
+
+        spreads = []
+        for near, far in zip(contracts, contracts[1:]):
+            span = max(1, (date.fromisoformat(far["expiry"]) - date.fromisoformat(near["expiry"])).days)
+            spreads.append({
+                "near":   near["key"],
+                "far":    far["key"],
+                "label":  f"{near['label']}/{far['label']}",
+                "spread": round(far["price"] - near["price"], 4),
+                "carry_pct_annual": round((far["price"] / near["price"] - 1) * 365 / span * 100, 2)
+                                    if near["price"] else None,
+            })
+        front = spreads[0]["spread"]
+        curves[commodity] = {
+            "contracts":  contracts,
+            "spreads":    spreads,
+            "structure":  "contango" if front > 0 else ("backwardation" if front < 0 else "flat"),
+            "inversions": sum(1 for sp in spreads if sp["spread"] < 0),
+        }
+    return curves
+
+
+def screen_spikes(fresh, prior_quarantine=None, window=SPIKE_WINDOW):
+    """
+    Drop bad prints from `fresh` before they reach history, stats or
+    prices.json. Returns {key: detail} for every quote quarantined, plus
+    the prior quarantines of symbols with no fresh quote this run: the
+    confirming print is the symbol's next quote, whenever that comes.
+
+    All symbols are scored in one pass: recent closes go into a NaN-padded
+    (symbols x window) matrix and the medians, MADs and z-scores for both
+    close and prev come out of a handful of array ops.
+    """
+    prior_quarantine = prior_quarantine or {}
+    quarantined = {k: v for k, v in prior_quarantine.items() if k not in fresh and k in SYMBOLS}
+    keys, rows = [], []
+    for key in fresh:
+        closes = [r[4] for r in price_history.tail(history_key(key), window)]
+        if len(closes) >= SPIKE_MIN_BARS:
+            keys.append(key)
+            rows.append(closes)
+    if not keys:
+        return quarantined
+
+    hist = np.full((len(keys), window), np.nan)
+    for i, closes in enumerate(rows):
+        hist[i, window - len(closes):] = closes
+    # _finish_quote() carries the previous close as "open"
+    new = np.array([[fresh[k]["close"], fresh[k]["open"]] for k in keys])
+
+    med = np.nanmedian(hist, axis=1)
+    mad = np.nanmedian(np.abs(hist - med[:, None]), axis=1) * 1.4826
+    scale = np.maximum(np.maximum(mad, np.abs(med) * SPIKE_FLOOR_PCT), 1e-9)
+    z = np.abs(new - med[:, None]) / scale[:, None]
+    bad = np.nonzero((z > SPIKE_Z).any(axis=1))[0]
+
+    for i in bad:
+        key = keys[i]
+        q = fresh[key]
+        held = prior_quarantine.get(key)
+        if held and abs(q["close"] / held["close"] - 1) <= SPIKE_CONFIRM_PCT:
+            print(f"  SPKOK {key:<18} {q['close']:>10.4f}  confirmed two runs running — accepted")
+            continue
+        quarantined[key] = {
+            "close":  q["close"],
+            "prev":   q["open"],
+            "median": round(float(med[i]), 4),
+            "z":      round(float(z[i].max()), 1),
+        }
+        print(f"  SPIKE {key:<18} {q['close']:>10.4f}  median {med[i]:.4f}  z={z[i].max():.1f} — quarantined")
+        del fresh[key]
+    return quarantined
+
+
+def apply_stats(stats, fresh):
+    """
+    Bring price_stats up to date with the history store, then stamp each
+    fresh quote with its snapshot. Once a symbol has MIN_RANGE_SESSIONS of
+    local history its wk52_hi / wk52_lo come from there too, so prices.json,
+    the pages and the briefing all quote the same range.
+    """
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    changed = False
+    tracked = {history_key(k) for k in SYMBOLS}
+    for key in tracked:
+        try:
+            changed |= price_stats.sync(stats, key, today)
+        except Exception as e:
+            print(f"  WARN stats {key}: {e}")
+    for key in [k for k in stats if k not in tracked]:
+        del stats[key]  # rolled-off contracts
+        changed = True
+
+    local = 0
+    for key, q in fresh.items():
+        st = stats.get(history_key(key))
+        if st is None:
+            continue
+        snap = st.snapshot(q["close"])
+        q["stats"] = snap
+        if snap["sessions"] >= price_stats.MIN_RANGE_SESSIONS:
+            q["wk52_hi"], q["wk52_lo"] = snap["hi_52w"], snap["lo_52w"]
+            local += 1
+    if changed:
+        price_stats.save(stats)
+    print(f"  stats: {len(stats)} symbols tracked, {local} quoting a local 52wk range"
+          f"{' (state saved)' if changed else ''}")
+
+
+def append_history(fresh):
+    """Fold this run's fresh (never KEPT) quotes into data/history/<key>.csv."""
+    now = datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
+    weekend = now.weekday() >= 5
+    written = 0
+    for key, q in fresh.items():
+        if weekend and key not in CRYPTO_KEYS:
+            continue
+        try:
+            price_history.append_snapshot(history_key(key), q["close"], today)
+            written += 1
+        except Exception as e:
+            print(f"  WARN history {key}: {e}")
+    print(f"  history: {written} daily bars updated in data/history/")
+
+
+def update_intraday(fresh, path=INTRADAY_PATH, size=INTRADAY_POINTS):
+    """
+    Push this run's prints onto a fixed-size window per symbol and publish it.
+
+    Layout is flat and column-shaped: one shared `t` array of epoch seconds
+    and one price array per symbol, all the same length and oldest first.
+    A symbol with no fresh print this run (KEPT, or not fetched) gets null
+    in its slot so every array stays aligned with `t`. Once `t` holds
+    `size` entries the oldest slot is dropped on each push.
+    """
+    try:
+        with open(path) as f:
+            prev = json.load(f)
+    except Exception:
+        prev = {}
+    t = list(prev.get("t", []))
+    old_series = prev.get("series", {})
+
+    t.append(int(time.time()))
+    n = len(t)
+    series = {}
+    for key in SYMBOLS:
+        arr = list(old_series.get(key, []))[-(n - 1):] if n > 1 else []
+        arr = [None] * (n - 1 - len(arr)) + arr
+        q = fresh.get(key)
+        arr.append(q["close"] if q else None)
+        series[key] = arr[-size:]
+    t = t[-size:]
+    # Contracts that rolled off the curve, or symbols silent for the whole
+    # window, drop out instead of publishing arrays of nulls.
+    series = {k: v for k, v in series.items() if any(x is not None for x in v)}
+
+    with open(path, "w") as f:
+        json.dump({"fetched": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                   "size": size, "t": t, "series": series},
+                  f, separators=(",", ":"), allow_nan=False)
+    print(f"  intraday: {len(series)} symbols x {len(t)} points → {path}")
+
+
+def _content(doc):
+    """prices.json minus the bookkeeping fields that change every run."""
+    return {k: v for k, v in doc.items() if k not in ("fetched", "seq")}
+
+
+def publish_prices(output, existing, path=PRICES_PATH, delta_path=DELTA_PATH):
+    """
+    Write prices.json and its delta, or nothing if no price changed.
+
+    The delta carries `seq` and `base` (the seq it applies on top of),
+    the quotes that changed or appeared, keys that dropped out under
+    `removed`, and any other top-level block (derived, curves, ...)
+    that differs, in full. A client holding `base` patches itself; any
+    other client refetches prices.json. Returns True if files were written.
+    """
+    # Round-trip so the comparison sees exactly what json.load would.
+    output = json.loads(json.dumps(output, allow_nan=False))
+    if existing and _content(output) == _content(existing):
+        return False
+
+    base = existing.get("seq", 0)
+    output["seq"] = base + 1
+    old_quotes = existing.get("quotes", {})
+    delta = {
+        "seq":     output["seq"],
+        "base":    base,
+        "fetched": output["fetched"],
+        "quotes":  {k: q for k, q in output["quotes"].items() if old_quotes.get(k) != q},
+        "removed": sorted(k for k in old_quotes if k not in output["quotes"]),
+    }
+    for k, v in output.items():
+        if k not in delta and k != "quotes" and existing.get(k) != v:
+            delta[k] = v
+
+    # allow_nan=False raises ValueError if any NaN/inf slipped past _num().
+    # Better to fail the workflow run loudly than write invalid JSON
+    # that breaks the homepage silently.
+    with open(path, "w") as f:
+        json.dump(output, f, indent=2, allow_nan=False)
+    with open(delta_path, "w") as f:
+        json.dump(delta, f, separators=(",", ":"), allow_nan=False)
+    print(f"  delta: seq {base} → {output['seq']}, {len(delta['quotes'])} quote(s) changed, "
+          f"{len(delta['removed'])} removed → {delta_path}")
+    return True
+
+
+def _download_bars(tickers, start, end):
+    """{ticker: [(date, open, high, low, close), ...]} for daily bars in [start, end)."""
+    frame = BACKEND.download(tickers, start=start, end=end, interval="1d",
+                             group_by="ticker", auto_adjust=False,
+                             threads=True, progress=False)
+    if frame is None or len(frame) == 0:
+        return {}
+    multi = getattr(frame.columns, "nlevels", 1) > 1
+    present = set(frame.columns.get_level_values(0)) if multi else set()
+    out = {}
+    for ticker in tickers:
+        if multi:
+            bars = frame[ticker] if ticker in present else None
+        else:
+            bars = frame if len(tickers) == 1 else None
+        if bars is None:
+            continue
+        rows = []
+        for ts, o, h, l, c in zip(bars.index, bars["Open"], bars["High"], bars["Low"], bars["Close"]):
+            c = _num(c)
+            if c is None:
+                continue  # NaN padding from another ticker's calendar
+            o, h, l = (_num(v) for v in (o, h, l))
+            rows.append((ts.strftime("%Y-%m-%d"),
+                         c if o is None else o, c if h is None else h, c if l is None else l, c))
+        out[ticker] = rows
+    return out
+
+
+def backfill(symbols, since, today=None, state_path=BACKFILL_STATE):
+    """
+    Fill data/history/<key>.csv with daily bars back to `since`.
+
+    Only missing ranges are requested: the span before a symbol's first
+    bar (unless a previous backfill already asked for it) and the span
+    after its last. Symbols sharing a range go out in one bulk download
+    per BACKFILL_CHUNK tickers, each chunk is merged and checkpointed
+    before the next, so an interrupted backfill resumes where it stopped.
+    Existing bars always win over downloaded ones.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    tomorrow = (today + timedelta(days=1)).isoformat()
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except Exception:
+        state = {}
+
+    symbols = {history_key(k): t for k, t in symbols.items()}
+    ranges = {}
+    for key, ticker in symbols.items():
+        rows = price_history.load_rows(key)
+        first = rows[0][0] if rows else tomorrow
+        if first > since and state.get(key, tomorrow) > since:
+            ranges.setdefault((since, first, True), {})[key] = ticker
+        if rows and rows[-1][0] < today.isoformat():
+            start = (date.fromisoformat(rows[-1][0]) + timedelta(days=1)).isoformat()
+            ranges.setdefault((start, tomorrow, False), {})[key] = ticker
+
+    touched = set()
+    total = 0
+    for (start, end, head), group in sorted(ranges.items()):
+        keys = list(group)
+        for i in range(0, len(keys), BACKFILL_CHUNK):
+            chunk = {k: group[k] for k in keys[i:i + BACKFILL_CHUNK]}
+            try:
+                bars = _download_bars(list(dict.fromkeys(chunk.values())), start, end)
+            except Exception as e:
+                print(f"  ERR  backfill {start}→{end}: {e}")
+                continue
+            for key, ticker in chunk.items():
+                added = price_history.merge_rows(key, bars.get(ticker, []))
+                if added:
+                    touched.add(key)
+                    total += added
+                if head:
+                    state[key] = min(state.get(key, since), since)
+                print(f"  FILL {key:18s} ({ticker:14s})  {start} → {end}  +{added} bars")
+            os.makedirs(os.path.dirname(state_path), exist_ok=True)
+            with open(state_path, "w") as f:
+                json.dump(state, f, indent=2, sort_keys=True)
+
+    # Stats built from the old, shorter files are rebuilt from the new ones.
+    if touched:
+        stats = price_stats.load()
+        for key in touched:
+            stats[key] = price_stats.seed(key, today.isoformat())
+        price_stats.save(stats)
+    print(f"  backfill: {total} bars added across {len(touched)} symbols "
+          f"({len(ranges)} range group(s) requested)")
+    return touched
+
+
+def fetch_symbols(symbols, mode, workers=FETCH_WORKERS, ticker_timeout=TICKER_TIMEOUT,
+                  deadline=RUN_DEADLINE, need_range=None):
+    """
+    The whole fetch phase for one strategy. Returns (results, latencies);
+    latencies cover the per-ticker requests only (batch is one call).
+    """
+    fetched = {}
+    todo = dict(symbols)
+    if mode == "batch" and symbols:
+        short = need_range is not None and not need_range
+        fetched = fetch_batch(symbols, BATCH_PERIOD_SHORT if short else BATCH_PERIOD)
+        todo = {k: t for k, t in symbols.items() if k not in fetched}
+        print(f"  batch: {len(fetched)}/{len(symbols)} covered, {len(todo)} to retry individually")
+
+    if SECONDARY is not None:
+        _hedge_pool(workers)
+    if mode == "serial":
+        more, latencies = fetch_serial(todo, need_range)
+    else:
+        more, latencies = fetch_concurrent(todo, workers, ticker_timeout, deadline, need_range)
+    fetched.update(more)
+    return fetched, latencies
+
+
+def _make_backend(args):
+    """Live Yahoo, a recorder around it, or a cassette replay, per the CLI."""
+    if args.replay:
+        slow = {}
+        for part in filter(None, (args.slow or "").split(",")):
+            ticker, _, secs = part.rpartition("=")
+            slow[ticker.strip()] = float(secs)
+        return quote_backend.ReplayBackend(
+            args.replay, latency=args.latency, scale=args.latency_scale,
+            jitter=args.jitter, overrides=slow, fail_rate=args.fail_rate,
+            fail=[t.strip() for t in (args.fail or "").split(",") if t.strip()],
+            seed=args.seed)
+    live = quote_backend.YahooBackend()
+    return quote_backend.RecordingBackend(live, args.record) if args.record else live
+
+
+def bench(symbols, args):
+    """Run each strategy against a fresh backend and print a comparison."""
+    global BACKEND
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    rows = []
+    for mode in modes:
+        BACKEND = _make_backend(args)
+        HEDGE_STATS.update(fired=0, won=0)
+        print(f"\n── {mode} " + "─" * 60)
+        t0 = time.monotonic()
+        fetched, latencies = fetch_symbols(symbols, mode, args.workers, args.ticker_timeout,
+                                           args.deadline, need_range=set(symbols))
+        wall = time.monotonic() - t0
+        _close_hedge_pool()
+        lat = list(latencies.values())
+        rows.append((mode, wall, len(fetched),
+                     _percentile(lat, 50) if lat else None,
+                     _percentile(lat, 95) if lat else None, len(lat),
+                     f"{HEDGE_STATS['won']}/{HEDGE_STATS['fired']}" if SECONDARY else "—"))
+
+    print()
+    print(f"  {'mode':<11}{'wall':>8}{'ok':>9}{'p50':>8}{'p95':>8}{'calls':>7}{'hedged':>8}")
+    for mode, wall, ok, p50, p95, calls, hedged in rows:
+        p50s = f"{p50:.2f}s" if p50 is not None else "—"
+        p95s = f"{p95:.2f}s" if p95 is not None else "—"
+        print(f"  {mode:<11}{wall:>7.2f}s{ok:>5}/{len(symbols):<3}{p50s:>8}{p95s:>8}{calls:>7}{hedged:>8}")
+
+
 def main():
-    print(f"\nAGSIST fetch_prices.py v3 — {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")
+    global BACKEND, SECONDARY, HEDGE_AFTER
+    parser = argparse.ArgumentParser(description="AGSIST price fetcher")
+    parser.add_argument("command", nargs="?", choices=("fetch", "backfill", "bench"),
+                        default="fetch",
+                        help="fetch = refresh prices.json (default); "
+                             "backfill = seed data/history/ with daily bars back to --since; "
+                             "bench = time each fetch strategy (use with --replay), write nothing")
+    parser.add_argument("--since", default="2015",
+                        help="backfill start: a year or YYYY-MM-DD (default 2015)")
+    parser.add_argument("--mode", choices=("batch", "concurrent", "serial"), default="batch",
+                        help="batch = one bulk download + per-ticker retry for misses (default); "
+                             "concurrent = per-ticker requests on a thread pool; "
+                             "serial = v3 one-request-per-ticker loop")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS,
+                        help=f"thread pool size for per-ticker fetches (default {FETCH_WORKERS})")
+    parser.add_argument("--ticker-timeout", type=float, default=TICKER_TIMEOUT,
+                        help=f"seconds before one ticker is abandoned (default {TICKER_TIMEOUT})")
+    parser.add_argument("--deadline", type=float, default=RUN_DEADLINE,
+                        help=f"seconds for the whole per-ticker phase (default {RUN_DEADLINE})")
+    parser.add_argument("--all", action="store_true",
+                        help="fetch every symbol regardless of exchange sessions")
+    parser.add_argument("--record", metavar="PATH",
+                        help="capture every upstream response to a replay cassette")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="serve quotes from a recorded cassette instead of Yahoo")
+    parser.add_argument("--latency", type=float, default=None,
+                        help="replay: fixed seconds per call (default: recorded latency)")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="replay: multiplier on recorded latencies (default 1.0)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="replay: +/- seconds of uniform jitter per call")
+    parser.add_argument("--slow", metavar="TICKER=SECS,...",
+                        help="replay: per-ticker latency overrides")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="replay: probability any single call fails")
+    parser.add_argument("--fail", metavar="TICKER,...",
+                        help="replay: tickers that always fail")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="replay: RNG seed for jitter and failures (default 0)")
+    parser.add_argument("--secondary", choices=("chart", "none"), default="chart",
+                        help="hedge source for slow or empty per-ticker answers (default chart)")
+    parser.add_argument("--secondary-url", default=None,
+                        help=f"base URL of the chart endpoint (default {quote_backend.CHART_BASE_URL}; "
+                             "point at `quote_backend.py serve` to test offline)")
+    parser.add_argument("--hedge-after", type=float, default=HEDGE_AFTER,
+                        help=f"seconds the primary gets before the secondary is asked too "
+                             f"(default {HEDGE_AFTER})")
+    parser.add_argument("--modes", default="serial,concurrent,batch",
+                        help="bench: strategies to compare (default serial,concurrent,batch)")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    HEDGE_AFTER = args.hedge_after
+    # Replays stay offline: no secondary unless it points at a stand-in.
+    if args.secondary == "chart" and (args.secondary_url or not args.replay):
+        SECONDARY = quote_backend.ChartSource(args.secondary_url or quote_backend.CHART_BASE_URL)
+    if args.command == "bench":
+        if not args.replay:
+            parser.error("bench needs --replay PATH (record one with --record)")
+        print(f"\nAGSIST fetch_prices.py v3.2 bench — replaying {args.replay}")
+        bench(SYMBOLS, args)
+        _exit_run()
+
+    BACKEND = _make_backend(args)
+    if args.command == "backfill":
+        since = f"{args.since}-01-01" if len(args.since) == 4 else args.since
+        print(f"\nAGSIST fetch_prices.py v3.2 backfill — since {since}")
+        print("-" * 70)
+        backfill(SYMBOLS, since)
+        print(f"Done in {time.monotonic() - started:.1f}s")
+        return
+
+    print(f"\nAGSIST fetch_prices.py v3.2 — {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}  [{args.mode}]")
     print("-" * 70)
 
     # Load existing data so we can preserve last-known values on failure
     try:
-        with open("data/prices.json", "r") as f:
+        with open(PRICES_PATH, "r") as f:
             existing = json.load(f)
         old_quotes = existing.get("quotes", {})
     except Exception:
+        existing = {}
         old_quotes = {}
 
+    # Only classes whose exchange is in session (or just settled) are
+    # fetched; the rest keep their last quote. A symbol with no quote yet
+    # (e.g. a contract that just listed) is fetched regardless.
+    sessions = market_sessions.due_classes()
+    due = {k: t for k, t in SYMBOLS.items()
+           if args.all or k not in old_quotes
+           or sessions[session_class(k)] in ("open", "settle")}
+    print("  sessions: " + ", ".join(f"{c} {st}" for c, st in sessions.items())
+          + f"  → {len(due)}/{len(SYMBOLS)} symbols due{' (--all)' if args.all else ''}")
+
+    # Symbols whose 52-week range price_stats can't vouch for yet still
+    # need it from upstream; everyone else skips the metadata lookup.
+    stats = price_stats.load()
+    need_range = {k for k in due if history_key(k) not in stats
+                  or len(stats[history_key(k)].closes) + 1 < price_stats.MIN_RANGE_SESSIONS}
+    print(f"  52wk range: {len(due) - len(need_range)} local, {len(need_range)} from upstream")
+
+    fetched, latencies = fetch_symbols(due, args.mode, args.workers, args.ticker_timeout,
+                                       args.deadline, need_range)
+    _close_hedge_pool()
+    if args.record:
+        BACKEND.save()
+
+    quarantined = screen_spikes(fetched, existing.get("quarantined"))
+    append_history(fetched)
+    apply_stats(stats, fetched)
+
     quotes = {}
     ok = 0
     fail = 0
+    idle = 0
 
-    for key, ticker in SYMBOLS.items():
-        result = fetch_quote(key, ticker)
+    for key in SYMBOLS:
+        result = fetched.get(key)
         if result:
             quotes[key] = result
             ok += 1
+        elif key not in due:
+            quotes[key] = old_quotes[key]  # market closed; not a failure
+            idle += 1
         else:
             # Preserve last known value rather than wiping it
             if key in old_quotes:
                 quotes[key] = old_quotes[key]
-                print(f"  KEPT {key} — using previous value")
+                why = "quarantined print" if key in quarantined else "using previous value"
+                print(f"  KEPT {key} — {why}")
             fail += 1
 
     output = {
         "fetched": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "ok":      ok,
         "failed":  fail,
-        "quotes":  quotes
+        "quotes":  quotes,
+        "quarantined": quarantined,
+        "derived": compute_derived(quotes),
+        "curves":  build_curves(quotes),
     }
 
-    # allow_nan=False raises ValueError if any NaN/inf slipped past _num().
-    # Better to fail the workflow run loudly than write invalid JSON
-    # that breaks the homepage silently.
-    with open("data/prices.json", "w") as f:
-        json.dump(output, f, indent=2, allow_nan=False)
+    update_intraday(fetched)
+
+    written = publish_prices(output, existing)
 
-    print(f"\nDone: {ok} fetched, {fail} failed → data/prices.json updated")
+    print()
+    print_latency_summary(latencies)
+    print_hedge_summary()
+    if quarantined:
+        print(f"  {len(quarantined)} quote(s) quarantined as spikes: {', '.join(sorted(quarantined))}")
+    print(f"Done: {ok} fetched, {fail} failed, {idle} idle in {time.monotonic() - started:.1f}s → "
+          f"{PRICES_PATH + ' updated' if written else 'no change, ' + PRICES_PATH + ' left as is'}")
     if ok == 0:
         print("WARNING: All fetches failed — prices.json unchanged from seed")
-        sys.exit(1)
+    _exit_run(1 if ok == 0 else 0)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,29 @@
 #!/usr/bin/env python3
 """
-AGSIST Daily Briefing Generator, v4.4.1
+AGSIST Daily Briefing Generator, v4.4.3
 ═══════════════════════════════════════════════════════════════════
 Generates the daily agricultural intelligence briefing via Claude API.
 
+v4.4.3:
+  - Surprise detection is volatility-adaptive: each move is scored as a
+    z-score against the symbol's EWMA daily sigma, which fetch_prices
+    keeps incrementally in price_stats.py and publishes per quote. A
+    quiet market's 1.5% move now outranks natgas's routine 3%. The
+    static SURPRISE_THRESHOLDS table only covers symbols without enough
+    history for a sigma.
+
+v4.4.2:
+  - build_chart_series reads the per-symbol daily bars that
+    fetch_prices.py now appends to data/history/ (see price_history.py)
+    instead of opening nine archive JSONs. Archive scan kept as the
+    fallback while the store is shallower than the sparkline window.
+  - corn-dec / beans-nov labels follow the contract the alias points at
+    (fetch_prices rolls them automatically now), not a hard-coded '26.
+  - load_prices appends the ratio/crush/oil-share/feeding-margin values
+    from prices.json's `derived` block to the locked price table.
+  - 52-week position uses the wk52 range fetch_prices now derives from
+    its own rolling stats; price lines add distance from the 50-day avg.
+
 v4.4 (the addictive-newsroom upgrade):
   - NEWS PIPELINE OVERHAUL: fetch_ag_news now pulls article summaries
     (not just titles), scores by recency, drops items >5 days old,
@@ -83,6 +103,10 @@ except ImportError:
     requests = None
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+import cbot_contracts
+import price_history
+
 PRICES_PATH = REPO_ROOT / "data" / "prices.json"
 OUTPUT_PATH = REPO_ROOT / "data" / "daily.json"
 QUOTE_POOL_PATH = REPO_ROOT / "data" / "quote-pool.json"
@@ -90,6 +114,12 @@ ANTHROPIC_API = "https://api.anthropic.com/v1/messages"
 MODEL = "claude-sonnet-4-20250514"
 OG_IMAGE_BASE = None
 
+# v4.4.3: moves are scored against each symbol's EWMA daily sigma from
+# fetch_prices (quote stats.sigma_1d) as z-scores; a move of SURPRISE_Z
+# sigmas is magnitude 1.0x. The static percent table below is only the
+# fallback for symbols without enough local history for a sigma yet.
+SURPRISE_Z = 2.0
+
 SURPRISE_THRESHOLDS = {
     "corn": 1.5, "corn-dec": 1.5, "beans": 1.5, "beans-nov": 1.5,
     "wheat": 2.0, "oats": 2.5, "cattle": 1.5, "feeders": 1.5,
@@ -112,6 +142,14 @@ COMMODITY_LABELS = {
 }
 
 GRAIN_KEYS = {"corn", "corn-dec", "beans", "beans-nov", "wheat", "oats"}
+NEW_CROP_KEYS = {"corn-dec": "Corn", "beans-nov": "Soybeans"}
+
+DERIVED_LABELS = {
+    "corn_bean_ratio":       ("Corn/bean ratio (Nov beans / Dec corn)", "{:.2f}:1"),
+    "board_crush":           ("Board crush margin", "${:.2f}/bu"),
+    "oil_share":             ("Soybean oil share of crush value", "{:.1f}%"),
+    "cattle_feeding_margin": ("Cattle feeding margin", "${:,.0f}/head"),
+}
 
 AG_RSS_FEEDS = [
     # Tier 1: USDA federal sources (canonical, slow-changing URLs)
@@ -318,6 +356,10 @@ def load_prices():
     for key, label in COMMODITY_LABELS.items():
         q = quotes.get(key)
         if not q or q.get("close") is None: continue
+        # New-crop aliases roll (cbot_contracts.py); label the month they point at today.
+        month_label = cbot_contracts.contract_label(q.get("ticker", ""))
+        if key in NEW_CROP_KEYS and month_label:
+            label = f"{NEW_CROP_KEYS[key]} {month_label}"
         close = float(q["close"]); opn = float(q.get("open", close))
         net = q.get("netChange"); pct = q.get("pctChange")
         net = float(net) if net is not None else (close - opn)
@@ -340,15 +382,35 @@ def load_prices():
             if hi > lo:
                 position = ((close - lo) / (hi - lo)) * 100
                 line += f" [52wk: {position:.0f}% from low]"
+        # v4.4.2: trend context from fetch_prices' rolling stats (price_stats.py)
+        st = q.get("stats") or {}
+        if st.get("sma50"):
+            line += f" [vs 50d avg: {(close / st['sma50'] - 1) * 100:+.1f}%]"
         price_lines.append(line)
-        threshold = SURPRISE_THRESHOLDS.get(key, 2.0)
-        if abs(pct) >= threshold:
+        sigma = st.get("sigma_1d")
+        if sigma:
+            z = abs(pct) / sigma
+            magnitude = z / SURPRISE_Z
+        else:
+            z = None
+            magnitude = abs(pct) / SURPRISE_THRESHOLDS.get(key, 2.0)
+        if magnitude >= 1.0:
             surprises.append({"commodity": label, "key": key, "price": price_str,
                 "pct_change": pct, "direction": "up" if pct > 0 else "down",
-                "surprise_magnitude": round(abs(pct) / threshold, 1)})
+                "surprise_magnitude": round(magnitude, 1),
+                "z_score": round(z, 1) if z is not None else None})
+    # v4.4.2: spreads/margins precomputed by fetch_prices.py (derived block)
+    derived = data.get("derived", {})
+    for name, (label, fmt) in DERIVED_LABELS.items():
+        d = derived.get(name)
+        if not d or d.get("value") is None: continue
+        line = f"  {label}: {fmt.format(d['value'])}"
+        if d.get("change") is not None: line += f" (chg {d['change']:+.2f})"
+        price_lines.append(line)
     surprises.sort(key=lambda x: x["surprise_magnitude"], reverse=True)
     return ({"price_block": "\n".join(price_lines), "locked_prices": locked_prices,
-             "fetched": fetched, "surprises": surprises, "quotes": quotes}, surprises)
+             "fetched": fetched, "surprises": surprises, "quotes": quotes,
+             "derived": derived}, surprises)
 
 
 def load_past_dailies(num_days=3):
@@ -398,7 +460,34 @@ def load_past_dailies(num_days=3):
     return header + "\n\n".join(blocks), past_tmyk_topics
 
 
+CHART_SERIES_KEYS = {"corn": "corn", "soybeans": "beans", "wheat": "wheat"}
+
+
 def build_chart_series(today_locked_prices, num_days=9):
+    """v4.4.2: one read of data/history/<key>.csv per series instead of
+    opening num_days archive JSONs. Until the history store is at least
+    num_days deep, falls back to the archive scan so sparklines don't
+    shrink while the store fills up."""
+    today_iso = datetime.now().strftime("%Y-%m-%d")
+    series = {}
+    for ser_key, src_key in CHART_SERIES_KEYS.items():
+        try:
+            rows = price_history.load_rows(src_key)
+        except Exception:
+            rows = []
+        past = [r for r in rows if r[0] < today_iso][-num_days:]
+        if len(past) < num_days:
+            return _chart_series_from_archive(today_locked_prices, num_days)
+        scale = 100 if src_key in GRAIN_KEYS else 1
+        series[ser_key] = [round(r[4] / scale, 2) for r in past if r[4] > 0]
+    for ser_key, src_key in CHART_SERIES_KEYS.items():
+        v = today_locked_prices.get(src_key)
+        if v and v > 0: series[ser_key].append(round(float(v), 2))
+    return {k: v for k, v in series.items() if len(v) >= 2}
+
+
+def _chart_series_from_archive(today_locked_prices, num_days=9):
+    """Pre-v4.4.2 path: rebuild the series from daily-archive locked_prices."""
     archive_dir = REPO_ROOT / "data" / "daily-archive"
     index_path = archive_dir / "index.json"
     if not index_path.exists(): return {}
@@ -409,7 +498,7 @@ def build_chart_series(today_locked_prices, num_days=9):
     today_iso = datetime.now().strftime("%Y-%m-%d")
     past = sorted([e for e in entries if e.get("date") and e["date"] != today_iso],
                   key=lambda e: e["date"])[-num_days:]
-    key_map = {"corn": "corn", "soybeans": "beans", "wheat": "wheat"}
+    key_map = CHART_SERIES_KEYS
     series = {k: [] for k in key_map}
     for entry in past:
         json_path = archive_dir / f"{entry.get('date', '')}.json"
@@ -1006,7 +1095,8 @@ def call_claude(price_data, surprises, news_block, seasonal_ctx, todays_quote, p
         lines = []
         for s in surprises:
             tier = "MAJOR" if s["surprise_magnitude"] >= 3.5 else ("SIGNIFICANT" if s["surprise_magnitude"] >= 2.5 else ("Notable" if s["surprise_magnitude"] >= 1.5 else "Mild"))
-            lines.append(f"  {tier}: {s['commodity']} moved {s['pct_change']:+.1f}% ({s['direction']}), magnitude {s['surprise_magnitude']}x")
+            sig = f", {s['z_score']} sigma vs its recent volatility" if s.get("z_score") is not None else ""
+            lines.append(f"  {tier}: {s['commodity']} moved {s['pct_change']:+.1f}% ({s['direction']}), magnitude {s['surprise_magnitude']}x{sig}")
         surprise_block = f"OVERNIGHT SURPRISES ({len(surprises)} above threshold):\n" + "\n".join(lines) + "\nFlag in relevant sections with overnight_surprise: true."
     elif market_status["is_closed"]:
         surprise_block = "Markets closed. Do not frame as 'overnight surprises.' Friday's close vs Thursday's."
@@ -2036,7 +2126,8 @@ def main():
     elif surprises:
         print(f"  {len(surprises)} overnight surprise(s)")
         for s in surprises:
-            print(f"    {s['commodity']}: {s['pct_change']:+.1f}%")
+            zs = f"  ({s['z_score']} sigma)" if s.get("z_score") is not None else ""
+            print(f"    {s['commodity']}: {s['pct_change']:+.1f}%{zs}")
     else:
         print("  No overnight surprises")
     print("  Loading past dailies...")
@@ -2136,7 +2227,7 @@ def main():
         print(f"  Section catalysts: {cats_with}/{cats_total} sections name a driver")
 
     briefing["generated_at"] = datetime.now(timezone.utc).isoformat()
-    briefing["generator_version"] = "4.4.1"
+    briefing["generator_version"] = "4.4.3"
     briefing["surprise_count"] = len(surprises)
     briefing["surprises"] = surprises
     briefing["price_validation_clean"] = is_clean
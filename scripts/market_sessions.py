@@ -0,0 +1,113 @@
+"""
+AGSIST exchange-session calendar.
+
+Decides which asset classes fetch_prices.py should poll on a given run.
+The workflow still fires every 30 minutes around the clock; this module
+is what keeps those runs from asking Yahoo for a CBOT grain quote at
+3 a.m. on a Saturday.
+
+Each class is a list of weekly windows in the exchange's own time zone
+(so DST is handled by zoneinfo, not by hand):
+
+    (start days, open, close, cadence minutes)
+
+Start days use Python weekday numbers (Mon=0 … Sun=6). A window whose
+close is not after its open runs past midnight into the next day, which
+is how the CME evening sessions are written ("Sun–Thu 19:00 → 07:45").
+
+Inside a window the class is due once per cadence: every run for 30,
+every other run for 60 (the thin overnight sessions). For SETTLE_GRACE
+minutes after a window closes the class stays due on every run, so the
+settlement print that Yahoo posts after the bell is always picked up.
+
+Exchange holidays are not modelled, the same as cbot_contracts.py. On a
+holiday the closed market is polled and Yahoo repeats the last settle,
+which the delta feed then treats as unchanged.
+
+Stdlib only.
+"""
+
+from datetime import datetime, time as dtime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+CHICAGO  = ZoneInfo("America/Chicago")
+NEW_YORK = ZoneInfo("America/New_York")
+
+SUN_THU = (6, 0, 1, 2, 3)
+MON_FRI = (0, 1, 2, 3, 4)
+EVERY_DAY = (0, 1, 2, 3, 4, 5, 6)
+
+# The cron interval in prices.yml. A cadence slot is "hit" by whichever
+# run lands in its first RUN_INTERVAL minutes.
+RUN_INTERVAL = 30
+SETTLE_GRACE = 60
+
+SESSIONS = {
+    # 24/7.
+    "crypto":    (timezone.utc, [(EVERY_DAY, "00:00", "00:00", 30)]),
+    # CBOT grains and oilseed products: overnight electronic session, then
+    # the day session that produces the settle.
+    "grains":    (CHICAGO, [(SUN_THU, "19:00", "07:45", 60),
+                            (MON_FRI, "08:30", "13:20", 30)]),
+    # CME live/feeder cattle and lean hogs: day session only.
+    "livestock": (CHICAGO, [(MON_FRI, "08:30", "13:05", 30)]),
+    # CME Globex energy, metals, dairy and the dollar index: nearly 24h
+    # Sunday to Friday with an hour's break at 16:00 CT. Overnight is
+    # polled hourly, the US day every run.
+    "globex":    (CHICAGO, [(SUN_THU, "17:00", "08:00", 60),
+                            (MON_FRI, "08:00", "16:00", 30)]),
+    # NYSE cash hours — S&P 500 and the 10-year yield index.
+    "nyse":      (NEW_YORK, [(MON_FRI, "09:30", "16:00", 30)]),
+}
+
+
+def _hhmm(s):
+    h, m = s.split(":")
+    return dtime(int(h), int(m))
+
+
+def _windows(tz, spec, local_day):
+    """(open, close) datetimes for every window starting on local_day."""
+    days, start, end, cadence = spec
+    if local_day.weekday() not in days:
+        return None
+    opens = datetime.combine(local_day, _hhmm(start), tz)
+    closes = datetime.combine(local_day, _hhmm(end), tz)
+    if closes <= opens:
+        closes += timedelta(days=1)
+    return opens, closes, cadence
+
+
+def status(cls, now=None):
+    """
+    "open" if the class is due this run inside a session, "settle" if it
+    is in the grace period after a close, "skip" if it is in session but
+    off-cadence, else "closed".
+    """
+    tz, specs = SESSIONS[cls]
+    now = (now or datetime.now(timezone.utc)).astimezone(tz)
+    result = "closed"
+    for back in (0, 1):
+        day = now.date() - timedelta(days=back)
+        for spec in specs:
+            w = _windows(tz, spec, day)
+            if w is None:
+                continue
+            opens, closes, cadence = w
+            if opens <= now < closes:
+                minutes = (now - opens).total_seconds() / 60
+                if minutes % cadence < RUN_INTERVAL:
+                    return "open"
+                result = "skip"
+            elif closes <= now < closes + timedelta(minutes=SETTLE_GRACE):
+                return "settle"
+    return result
+
+
+def is_due(cls, now=None):
+    return status(cls, now) in ("open", "settle")
+
+
+def due_classes(now=None):
+    """{class: status} for every class in SESSIONS."""
+    return {cls: status(cls, now) for cls in SESSIONS}
@@ -0,0 +1,116 @@
+"""
+AGSIST prediction-market odds history.
+
+One small JSON file, data/markets-history.json, holding a time series
+per market keyed "<platform>:<ticker>". Each series is a flat list of
+integers, delta-encoded in (minute, yes %, volume) triples:
+
+    "Kalshi:KXFED-26DEC-T3.50": [29473920, 41, 18250, 1440, 3, 920, 1442, -1, 1310]
+
+The first triple is absolute (minutes since the Unix epoch, yes %,
+volume); every later triple is the change from the one before. Points
+come from the daily discovery run and the hourly --refresh run, so a
+triple is usually "60" minutes, a one- or two-digit odds move and a
+volume change of a few digits: about 12 bytes per point, ~4 KB per
+market for RETAIN_DAYS of hourly points, and on the order of 100-150 KB
+for the few dozen markets selected at a time. Each series is written on
+its own line, sorted by key, so a run's git diff is one changed line per
+market it touched.
+
+fetch_markets.py appends every selected market once per run and reads
+its 24h / 7d change back out of the same series (change()), so movers
+cost nothing upstream. Points older than RETAIN_DAYS are dropped, and a
+market that has not been selected for that long disappears with them.
+
+Stdlib only.
+"""
+
+import json
+import os
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HISTORY_PATH = REPO_ROOT / "data" / "markets-history.json"
+
+RETAIN_DAYS = 14
+
+# A run counts as "24h ago" if it is at least this much older than
+# window - SLACK, so a daily cron that fires a little early still matches.
+SLACK_MINUTES = 120
+
+
+def _decode(flat):
+    points, t, y, v = [], 0, 0, 0
+    for i in range(0, len(flat) - 2, 3):
+        t, y, v = t + flat[i], y + flat[i + 1], v + flat[i + 2]
+        points.append((t, y, v))
+    return points
+
+
+def _encode(points):
+    flat, prev = [], (0, 0, 0)
+    for p in points:
+        flat.extend((p[0] - prev[0], p[1] - prev[1], p[2] - prev[2]))
+        prev = p
+    return flat
+
+
+def load(path=None):
+    """{key: [(minute, yes, volume), ...]} oldest first (empty on first run)."""
+    try:
+        with open(path or HISTORY_PATH) as f:
+            raw = json.load(f)
+    except Exception:
+        return {}
+    return {k: _decode(v) for k, v in raw.get("series", {}).items()}
+
+
+def save(series, path=None):
+    path = Path(path or HISTORY_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    lines = ",\n".join(f"{json.dumps(k)}:{json.dumps(_encode(v), separators=(',', ':'))}"
+                       for k, v in sorted(series.items()) if v)
+    with open(tmp, "w") as f:
+        f.write(f'{{"version":1,"series":{{\n{lines}\n}}}}\n')
+    os.replace(tmp, path)
+
+
+def append(series, key, minute, yes, volume):
+    """Add one observation; a second one in the same minute replaces the first."""
+    points = series.setdefault(key, [])
+    point = (int(minute), int(yes), int(round(volume or 0)))
+    if points and points[-1][0] >= point[0]:
+        if points[-1][0] == point[0]:
+            points[-1] = point
+        return
+    points.append(point)
+
+
+def prune(series, now_minute, days=RETAIN_DAYS):
+    """Drop points older than `days`, and series left empty. Returns series removed."""
+    cutoff = now_minute - days * 1440
+    dropped = 0
+    for key in list(series):
+        kept = [p for p in series[key] if p[0] >= cutoff]
+        if kept:
+            series[key] = kept
+        else:
+            del series[key]
+            dropped += 1
+    return dropped
+
+
+def change(points, hours):
+    """
+    Yes-% change from the newest point back to the newest point at least
+    `hours` old (less SLACK_MINUTES), or None when the series is younger.
+    """
+    if len(points) < 2:
+        return None
+    now = points[-1][0]
+    limit = now - hours * 60 + SLACK_MINUTES
+    for t, y, _ in reversed(points[:-1]):
+        if t <= limit:
+            return points[-1][1] - y
+    return None
@@ -0,0 +1,160 @@
+"""
+AGSIST price history store.
+
+One append-only CSV per symbol under data/history/<key>.csv:
+
+    date,open,high,low,close
+    2026-10-15,421.5,426.25,419.0,424.75
+    2026-10-16,424.5,430.0,423.75,428.0
+
+Each fetch_prices.py run folds its snapshot into the current day's bar
+(first print = open, running high/low, latest print = close). A new UTC
+date appends a row; the same date rewrites only the last line, so a run
+touches a few dozen bytes at the tail of each file and git diffs stay
+one line per symbol per day.
+
+Readers get columns back as plain lists (load_columns), so sparklines,
+52-week ranges and trend math are one sequential read of one small file
+instead of a scan over the daily-archive JSONs.
+
+Prices are stored exactly as prices.json quotes them (grains in cents).
+
+`fetch_prices.py backfill` seeds multi-year history through merge_rows(),
+the one writer that rewrites a whole file (atomically, via a temp file).
+
+Stdlib only — generate_daily.py imports this and runs without yfinance.
+"""
+
+import os
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HISTORY_DIR = REPO_ROOT / "data" / "history"
+
+FIELDS = ("date", "open", "high", "low", "close")
+HEADER = ",".join(FIELDS) + "\n"
+
+
+def history_path(key, root=None):
+    return Path(root or HISTORY_DIR) / f"{key}.csv"
+
+
+def _fmt(v):
+    return repr(round(float(v), 5))
+
+
+def _format_row(date_iso, o, h, l, c):
+    return f"{date_iso},{_fmt(o)},{_fmt(h)},{_fmt(l)},{_fmt(c)}\n"
+
+
+def _parse_row(line):
+    parts = line.strip().split(",")
+    if len(parts) != len(FIELDS) or parts[0] == "date":
+        return None
+    try:
+        return (parts[0], float(parts[1]), float(parts[2]), float(parts[3]), float(parts[4]))
+    except ValueError:
+        return None
+
+
+def _last_line_offset(f, end=None):
+    """Byte offset where the last line ending at `end` (default EOF) starts."""
+    if end is None:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+    pos = end - 1  # skip the trailing newline
+    while pos > 0:
+        step = min(256, pos)
+        f.seek(pos - step)
+        chunk = f.read(step)
+        nl = chunk.rfind(b"\n")
+        if nl != -1:
+            return pos - step + nl + 1
+        pos -= step
+    return 0
+
+
+def append_snapshot(key, price, date_iso, root=None):
+    """Fold one price print into the daily bar for date_iso."""
+    path = history_path(key, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    price = float(price)
+    if not path.exists() or path.stat().st_size == 0:
+        with open(path, "w") as f:
+            f.write(HEADER + _format_row(date_iso, price, price, price, price))
+        return
+
+    with open(path, "r+b") as f:
+        start = _last_line_offset(f)
+        f.seek(start)
+        last = _parse_row(f.read().decode("utf-8"))
+        if last and last[0] == date_iso:
+            _, o, h, l, _ = last
+            f.seek(start)
+            f.truncate()
+            f.write(_format_row(date_iso, o, max(h, price), min(l, price), price).encode("utf-8"))
+        elif last and last[0] > date_iso:
+            return  # out-of-order snapshot; never rewrite history
+        else:
+            f.seek(0, os.SEEK_END)
+            f.write(_format_row(date_iso, price, price, price, price).encode("utf-8"))
+
+
+def tail(key, n, root=None):
+    """The last n bars for key, oldest first, read from the end of the file."""
+    path = history_path(key, root)
+    if not path.exists():
+        return []
+    rows = []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        while len(rows) < n and end > 0:
+            start = _last_line_offset(f, end)
+            f.seek(start)
+            row = _parse_row(f.read(end - start).decode("utf-8"))
+            if row is None:
+                break  # reached the header
+            rows.append(row)
+            end = start
+    return rows[::-1]
+
+
+def load_rows(key, since=None, root=None):
+    """All bars for key as (date, open, high, low, close) tuples, oldest first."""
+    path = history_path(key, root)
+    if not path.exists():
+        return []
+    rows = []
+    with open(path) as f:
+        for line in f:
+            row = _parse_row(line)
+            if row and (since is None or row[0] >= since):
+                rows.append(row)
+    return rows
+
+
+def load_columns(key, since=None, root=None):
+    """Bars for key as {"date": [...], "open": [...], ..., "close": [...]}."""
+    rows = load_rows(key, since=since, root=root)
+    return {name: [r[i] for r in rows] for i, name in enumerate(FIELDS)}
+
+
+def merge_rows(key, rows, root=None):
+    """
+    Merge (date, open, high, low, close) bars into key's file, keeping the
+    existing bar wherever both have the same date. Returns bars added.
+    """
+    existing = {r[0]: r for r in load_rows(key, root=root)}
+    added = {r[0]: r for r in rows if r[0] not in existing}
+    if not added:
+        return 0
+    path = history_path(key, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    merged = sorted({**existing, **added}.values())
+    tmp = path.with_suffix(".csv.tmp")
+    with open(tmp, "w") as f:
+        f.write(HEADER)
+        f.writelines(_format_row(*r) for r in merged)
+    os.replace(tmp, path)
+    return len(added)
@@ -0,0 +1,220 @@
+"""
+AGSIST rolling price statistics.
+
+Per-symbol 52-week high/low, 20/50-day moving averages, 20-day realized
+volatility and 52-week percentile rank, maintained incrementally over
+the daily closes in data/history/ (price_history.py).
+
+State lives in data/price-stats.json. For every symbol it holds the
+last WINDOW - 1 finished sessions plus running aggregates:
+
+  - sums of the last 19 / 49 closes (moving averages)
+  - sum and sum of squares of the last 19 log returns (realized vol)
+  - monotonic max/min queues over the window (52-week high/low)
+  - the window kept sorted (percentile rank by bisection)
+
+Folding in a finished session is O(1) for the running sums but
+O(WINDOW) overall: bisect finds the sorted-window slot in O(log WINDOW),
+yet the insert and delete on the 251-slot list, and the pop(0) that
+ages out a max/min queue front, each shift up to WINDOW entries (a
+memmove, microseconds per symbol). Nothing ever rescans the history
+files except the one-time seed for a symbol with no state.
+
+An EWMA of squared daily log returns (RiskMetrics, lambda 0.94) rides
+along in the same commit: one multiply-add per session. snapshot()
+reports it as `sigma_1d`, the expected size of a one-day move in
+percent, from finished sessions only, so today's move can be scored
+against it as a z-score (generate_daily.py surprise detection).
+
+snapshot() evaluates every statistic with the live print as the newest
+session, so the numbers move intraday without touching the state. The
+state file therefore only changes when a day closes, not every run.
+
+fetch_prices.py writes each snapshot into its quote (`stats`, and the
+wk52_hi / wk52_lo fields once a symbol has MIN_RANGE_SESSIONS of
+history), and generate_daily.py reads the same numbers from prices.json.
+
+Stdlib only.
+"""
+
+import bisect
+import json
+import math
+from pathlib import Path
+
+import price_history
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STATS_PATH = REPO_ROOT / "data" / "price-stats.json"
+
+WINDOW = 252            # sessions in the 52-week window, live print included
+SMA_FAST = 20
+SMA_SLOW = 50
+VOL_WINDOW = 20         # returns in the realized-vol window, live return included
+TRADING_DAYS = 252
+EWMA_LAMBDA = 0.94
+EWMA_MIN_RETURNS = 20   # returns folded in before sigma_1d is reported
+
+# Below this many sessions the local 52-week range is too short to stand in
+# for Yahoo's year_high / year_low.
+MIN_RANGE_SESSIONS = 200
+
+# How many bars sync() reads from the tail of a history file. A symbol that
+# has missed more sessions than this is reseeded from the full file.
+SYNC_TAIL = 6
+
+
+class SymbolStats:
+    """Finished sessions for one symbol and the aggregates over them."""
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.date    = state.get("date")        # last finished session folded in
+        self.n       = state.get("n", 0)        # sessions folded in, ever
+        self.closes  = state.get("closes", [])  # last WINDOW - 1, oldest first
+        self.sorted  = state.get("sorted", [])
+        self.maxq    = state.get("maxq", [])    # [[n, close], ...] decreasing
+        self.minq    = state.get("minq", [])    # [[n, close], ...] increasing
+        self.sum_fast = state.get("sum_fast", 0.0)
+        self.sum_slow = state.get("sum_slow", 0.0)
+        self.ret_sum  = state.get("ret_sum", 0.0)
+        self.ret_sq   = state.get("ret_sq", 0.0)
+        # State saved before the EWMA existed has no ewma_var; None makes
+        # sync() reseed it once from the history file.
+        self.ewma_var = state.get("ewma_var", None if state else 0.0)
+        self.ewma_n   = state.get("ewma_n", 0)
+
+    def to_state(self):
+        return {
+            "date": self.date, "n": self.n,
+            "closes": self.closes, "sorted": self.sorted,
+            "maxq": self.maxq, "minq": self.minq,
+            "sum_fast": self.sum_fast, "sum_slow": self.sum_slow,
+            "ret_sum": self.ret_sum, "ret_sq": self.ret_sq,
+            "ewma_var": self.ewma_var, "ewma_n": self.ewma_n,
+        }
+
+    @staticmethod
+    def _ret(a, b):
+        return math.log(b / a) if a > 0 and b > 0 else 0.0
+
+    def commit(self, date_iso, close):
+        """Fold one finished session into the window (O(WINDOW), see module docstring)."""
+        c = self.closes
+        c.append(close)
+        m = len(c) - 1
+
+        # Running sums hold the last N-1 closes / V-1 returns, leaving one
+        # slot for the live print in snapshot().
+        self.sum_fast += close
+        if len(c) > SMA_FAST - 1:
+            self.sum_fast -= c[-SMA_FAST]
+        self.sum_slow += close
+        if len(c) > SMA_SLOW - 1:
+            self.sum_slow -= c[-SMA_SLOW]
+        if m >= 1:
+            r = self._ret(c[m - 1], c[m])
+            self.ret_sum += r
+            self.ret_sq += r * r
+            self.ewma_var = (EWMA_LAMBDA * self.ewma_var + (1 - EWMA_LAMBDA) * r * r
+                             if self.ewma_n else r * r)
+            self.ewma_n += 1
+        if m - (VOL_WINDOW - 1) >= 1:
+            r = self._ret(c[m - VOL_WINDOW], c[m - VOL_WINDOW + 1])
+            self.ret_sum -= r
+            self.ret_sq -= r * r
+
+        # Monotonic queues: front is the window max / min.
+        oldest_live = self.n - (WINDOW - 1) + 1
+        while self.maxq and self.maxq[-1][1] <= close:
+            self.maxq.pop()
+        self.maxq.append([self.n, close])
+        while self.maxq[0][0] < oldest_live:
+            self.maxq.pop(0)
+        while self.minq and self.minq[-1][1] >= close:
+            self.minq.pop()
+        self.minq.append([self.n, close])
+        while self.minq[0][0] < oldest_live:
+            self.minq.pop(0)
+
+        bisect.insort(self.sorted, close)
+        if len(c) > WINDOW - 1:
+            old = c.pop(0)
+            del self.sorted[bisect.bisect_left(self.sorted, old)]
+
+        self.n += 1
+        self.date = date_iso
+
+    def snapshot(self, close):
+        """All statistics with `close` as the newest session."""
+        c = self.closes
+        out = {"sessions": len(c) + 1}
+        hi = max(self.maxq[0][1], close) if self.maxq else close
+        lo = min(self.minq[0][1], close) if self.minq else close
+        out["hi_52w"] = round(hi, 4)
+        out["lo_52w"] = round(lo, 4)
+        out["range_pos"] = round((close - lo) / (hi - lo) * 100, 1) if hi > lo else None
+        out["sma20"] = round((self.sum_fast + close) / SMA_FAST, 4) if len(c) >= SMA_FAST - 1 else None
+        out["sma50"] = round((self.sum_slow + close) / SMA_SLOW, 4) if len(c) >= SMA_SLOW - 1 else None
+
+        vol = None
+        if len(c) >= VOL_WINDOW:
+            r = self._ret(c[-1], close)
+            k = VOL_WINDOW
+            mean = (self.ret_sum + r) / k
+            var = max(0.0, (self.ret_sq + r * r - k * mean * mean) / (k - 1))
+            vol = round(math.sqrt(var * TRADING_DAYS) * 100, 2)
+        out["vol20"] = vol
+        out["sigma_1d"] = (round(math.sqrt(self.ewma_var) * 100, 3)
+                           if self.ewma_n >= EWMA_MIN_RETURNS and self.ewma_var else None)
+        out["pct_rank"] = (round(bisect.bisect_left(self.sorted, close) / len(self.sorted) * 100, 1)
+                           if self.sorted else None)
+        return out
+
+
+def load(path=None):
+    """{key: SymbolStats} from disk (empty on first run)."""
+    try:
+        with open(path or STATS_PATH) as f:
+            raw = json.load(f)
+    except Exception:
+        return {}
+    return {k: SymbolStats(v) for k, v in raw.get("symbols", {}).items()}
+
+
+def save(stats, path=None):
+    with open(path or STATS_PATH, "w") as f:
+        json.dump({"window": WINDOW,
+                   "symbols": {k: s.to_state() for k, s in sorted(stats.items())}},
+                  f, separators=(",", ":"), allow_nan=False)
+
+
+def seed(key, today_iso, root=None):
+    """Build a symbol's state from its full history file (first run / long gap)."""
+    st = SymbolStats()
+    for row in price_history.load_rows(key, root=root):
+        if row[0] < today_iso:
+            st.commit(row[0], row[4])
+    return st
+
+
+def sync(stats, key, today_iso, root=None):
+    """
+    Fold every session the history store has finished since the state's
+    last date. Reads only the tail of the file. Returns True when the
+    state changed (so the caller knows to save).
+    """
+    st = stats.get(key)
+    rows = price_history.tail(key, SYNC_TAIL, root=root)
+    if not rows:
+        return False
+    if (st is None or st.date is None or st.ewma_var is None
+            or (len(rows) == SYNC_TAIL and st.date < rows[0][0])):
+        stats[key] = seed(key, today_iso, root=root)
+        return st is None or st.ewma_var is None or stats[key].date != st.date
+    changed = False
+    for row in rows:
+        if st.date < row[0] < today_iso:
+            st.commit(row[0], row[4])
+            changed = True
+    return changed
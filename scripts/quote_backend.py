@@ -0,0 +1,385 @@
+"""
+AGSIST quote backends for fetch_prices.py.
+
+fetch_prices.py never calls yfinance directly; it goes through a backend
+with two methods that mirror the two yfinance entry points it uses:
+
+    backend.ticker(symbol)         → object with .fast_info and .history()
+    backend.download(tickers, ...) → yf.download()-shaped DataFrame
+
+Three backends:
+
+  YahooBackend      live yfinance (the default).
+  RecordingBackend  wraps another backend and captures every fast_info
+                    field read, history() frame and per-ticker download
+                    bars, with how long each call took, to a JSON cassette.
+  ReplayBackend     serves a cassette offline. Latency is the recorded
+                    one (scaled), a fixed value, or a per-ticker override,
+                    plus optional jitter; failures can be injected at a
+                    rate or pinned to specific tickers. Seeded, so a
+                    benchmark run is reproducible.
+
+Record once against live Yahoo:
+
+    python scripts/fetch_prices.py --all --record cassette.json
+
+then compare strategies anywhere, no network needed:
+
+    python scripts/fetch_prices.py bench --replay cassette.json --fail-rate 0.05
+
+Cassettes store NaN as null; replay turns them back into NaN so the
+_num() sanitizing path is exercised exactly as it is live.
+
+Secondary source. ChartSource reads Yahoo's v8 chart endpoint over plain
+urllib — a different API and client from yfinance, so it still answers
+when the yfinance path stalls (session/crumb trouble, a slow
+quoteSummary call) or returns NaN. It is not an independent provider:
+the same Yahoo backend serves both, so a slow or down Yahoo stalls the
+hedge too, and --secondary-url is the place to point it at another
+source with the same response shape. fetch_prices
+fires it as a hedge when the primary misses its latency budget. The base
+URL is configurable, and ChartStandIn serves the same JSON shape from a
+cassette on localhost so hedging can be exercised offline:
+
+    python scripts/quote_backend.py serve cassette.json --port 8765 --latency 0.2
+    python scripts/fetch_prices.py bench --replay cassette.json \
+        --secondary-url http://127.0.0.1:8765 --slow ZC=F=8
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlparse
+from urllib.request import Request, urlopen
+
+# fast_info attributes fetch_prices reads; the recorder captures whichever
+# of these are touched.
+FAST_INFO_FIELDS = ("last_price", "regular_market_price", "previous_close",
+                    "regular_market_previous_close", "year_high", "year_low")
+BAR_FIELDS = ("Open", "High", "Low", "Close")
+
+CHART_BASE_URL = "https://query2.finance.yahoo.com"
+CHART_TIMEOUT = 10
+
+
+class ReplayError(ConnectionError):
+    """Injected failure, raised where yfinance would raise a network error."""
+
+
+def _clean(v):
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) or math.isinf(f) else f
+
+
+def _frame_to_json(frame):
+    """DataFrame with a DatetimeIndex → {"index": [...], col: [...]}."""
+    out = {"index": [ts.strftime("%Y-%m-%d") for ts in frame.index]}
+    for col in BAR_FIELDS:
+        if col in frame:
+            out[col] = [_clean(v) for v in frame[col].tolist()]
+    return out
+
+
+def _json_to_frame(data, columns=BAR_FIELDS):
+    import pandas as pd
+    index = pd.to_datetime(data.get("index", []))
+    return pd.DataFrame({c: [float("nan") if v is None else v for v in data.get(c, [])]
+                         for c in columns if c in data}, index=index)
+
+
+# ── Live ─────────────────────────────────────────────────────────
+
+class YahooBackend:
+    name = "yahoo"
+
+    def __init__(self):
+        import yfinance
+        self.yf = yfinance
+
+    def ticker(self, symbol):
+        return self.yf.Ticker(symbol)
+
+    def download(self, tickers, **kw):
+        return self.yf.download(tickers, **kw)
+
+
+# ── Recorder ─────────────────────────────────────────────────────
+
+class _RecordingInfo:
+    def __init__(self, inner, sink):
+        self._inner, self._sink = inner, sink
+
+    def __getattr__(self, name):
+        t0 = time.monotonic()
+        value = getattr(self._inner, name, None)
+        self._sink[name] = _clean(value)
+        self._sink.setdefault("_latency", {})[name] = round(time.monotonic() - t0, 4)
+        return value
+
+
+class _RecordingTicker:
+    def __init__(self, inner, symbol, cassette):
+        self._inner, self._symbol, self._cassette = inner, symbol, cassette
+
+    @property
+    def fast_info(self):
+        sink = self._cassette["fast_info"].setdefault(self._symbol, {})
+        return _RecordingInfo(self._inner.fast_info, sink)
+
+    def history(self, period=None, interval="1d", **kw):
+        t0 = time.monotonic()
+        frame = self._inner.history(period=period, interval=interval, **kw)
+        rec = _frame_to_json(frame)
+        rec["_latency"] = round(time.monotonic() - t0, 4)
+        self._cassette["history"].setdefault(self._symbol, {})[f"{period}|{interval}"] = rec
+        return frame
+
+
+class RecordingBackend:
+    name = "record"
+
+    def __init__(self, inner, path):
+        self.inner, self.path = inner, path
+        self.cassette = {"recorded": None, "fast_info": {}, "history": {}, "download": {}}
+        self._lock = threading.Lock()
+
+    def ticker(self, symbol):
+        return _RecordingTicker(self.inner.ticker(symbol), symbol, self.cassette)
+
+    def download(self, tickers, **kw):
+        t0 = time.monotonic()
+        frame = self.inner.download(tickers, **kw)
+        latency = round(time.monotonic() - t0, 4)
+        if frame is None or len(frame) == 0:
+            return frame
+        multi = getattr(frame.columns, "nlevels", 1) > 1
+        present = set(frame.columns.get_level_values(0)) if multi else set()
+        with self._lock:
+            for t in tickers:
+                if multi and t not in present:
+                    continue
+                bars = frame[t] if multi else frame
+                rec = _frame_to_json(bars.dropna(subset=["Close"]))
+                old = self.cassette["download"].get(t)
+                # Keep the longest window seen so replay can serve any shorter one.
+                if old is None or len(rec["index"]) >= len(old["index"]):
+                    rec["_latency"] = latency
+                    self.cassette["download"][t] = rec
+        return frame
+
+    def save(self):
+        self.cassette["recorded"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with open(self.path, "w") as f:
+            json.dump(self.cassette, f, separators=(",", ":"))
+        n = len(set(self.cassette["fast_info"]) | set(self.cassette["history"])
+                | set(self.cassette["download"]))
+        print(f"  recorded {n} tickers → {self.path}")
+
+
+# ── Replay ───────────────────────────────────────────────────────
+
+class _ReplayInfo:
+    def __init__(self, fields):
+        self._fields = fields
+
+    def __getattr__(self, name):
+        v = self._fields.get(name)
+        return float("nan") if v is None else v
+
+
+class _ReplayTicker:
+    def __init__(self, backend, symbol):
+        self._b, self._symbol = backend, symbol
+
+    @property
+    def fast_info(self):
+        fields = self._b.cassette["fast_info"].get(self._symbol, {})
+        self._b._delay(self._symbol, sum(fields.get("_latency", {}).values()))
+        self._b._maybe_fail(self._symbol)
+        return _ReplayInfo(fields)
+
+    def history(self, period=None, interval="1d", **kw):
+        rec = self._b.cassette["history"].get(self._symbol, {}).get(f"{period}|{interval}")
+        self._b._delay(self._symbol, rec.get("_latency", 0) if rec else 0)
+        self._b._maybe_fail(self._symbol)
+        return _json_to_frame(rec or {"index": [], "Close": []})
+
+
+class ReplayBackend:
+    name = "replay"
+
+    def __init__(self, path, latency=None, scale=1.0, jitter=0.0, overrides=None,
+                 fail_rate=0.0, fail=(), seed=0):
+        """
+        latency:   fixed seconds per call (None = the recorded latency × scale)
+        jitter:    ± uniform seconds added to every delay
+        overrides: {ticker: seconds} — wins over both of the above
+        fail_rate: probability any single call raises ReplayError
+        fail:      tickers that always fail
+        """
+        with open(path) as f:
+            self.cassette = json.load(f)
+        self.latency, self.scale, self.jitter = latency, scale, jitter
+        self.overrides = overrides or {}
+        self.fail_rate, self.fail = fail_rate, set(fail)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _rand(self):
+        with self._lock:
+            return self._rng.random()
+
+    def _delay(self, symbol, recorded):
+        if symbol in self.overrides:
+            d = self.overrides[symbol]
+        elif self.latency is not None:
+            d = self.latency
+        else:
+            d = recorded * self.scale
+        if self.jitter:
+            d += (self._rand() * 2 - 1) * self.jitter
+        if d > 0:
+            time.sleep(d)
+
+    def _maybe_fail(self, symbol):
+        if symbol in self.fail or (self.fail_rate and self._rand() < self.fail_rate):
+            raise ReplayError(f"injected failure for {symbol}")
+
+    def ticker(self, symbol):
+        return _ReplayTicker(self, symbol)
+
+    def download(self, tickers, period=None, start=None, end=None, **kw):
+        import pandas as pd
+        recs = {t: self.cassette["download"].get(t) for t in tickers}
+        self._delay(None, max((r.get("_latency", 0) for r in recs.values() if r), default=0))
+        parts = {}
+        for t, rec in recs.items():
+            if rec is None or t in self.fail or (self.fail_rate and self._rand() < self.fail_rate):
+                continue  # Yahoo drops failed tickers from a bulk frame
+            frame = _json_to_frame(rec)
+            if start:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            if end:
+                frame = frame[frame.index < pd.Timestamp(end)]
+            if period and period.endswith("d") and len(frame):
+                cut = frame.index[-1] - timedelta(days=int(period[:-1]))
+                frame = frame[frame.index > cut]
+            parts[t] = frame
+        if not parts:
+            return pd.DataFrame()
+        # Outer-join on dates: NaN padding across calendars, as live.
+        return pd.concat(parts, axis=1)
+
+
+# ── Secondary source ─────────────────────────────────────────────
+
+class ChartSource:
+    """
+    One ticker from the v8 chart endpoint. quote() returns
+    {"close", "prev", "wk52_hi", "wk52_lo"} (values may be None) or raises.
+    """
+    name = "chart"
+
+    def __init__(self, base_url=CHART_BASE_URL, timeout=CHART_TIMEOUT):
+        self.base_url, self.timeout = base_url.rstrip("/"), timeout
+
+    def quote(self, ticker):
+        url = f"{self.base_url}/v8/finance/chart/{quote(ticker)}?range=5d&interval=1d"
+        req = Request(url, headers={"User-Agent": "Mozilla/5.0 (AGSIST price fetcher)"})
+        with urlopen(req, timeout=self.timeout) as resp:
+            data = json.load(resp)
+        result = (data.get("chart", {}).get("result") or [None])[0]
+        if not result:
+            raise ValueError(f"no chart result for {ticker}")
+        meta = result.get("meta", {})
+        bars = (result.get("indicators", {}).get("quote") or [{}])[0]
+        closes = [c for c in (_clean(v) for v in bars.get("close", [])) if c is not None]
+        close = _clean(meta.get("regularMarketPrice"))
+        if close is None and closes:
+            close = closes[-1]
+        prev = closes[-2] if len(closes) >= 2 else _clean(meta.get("chartPreviousClose"))
+        return {"close": close, "prev": prev,
+                "wk52_hi": _clean(meta.get("fiftyTwoWeekHigh")),
+                "wk52_lo": _clean(meta.get("fiftyTwoWeekLow"))}
+
+
+class ChartStandIn:
+    """
+    Local HTTP server answering /v8/finance/chart/<ticker> from a cassette's
+    download bars, with optional latency — the offline secondary source.
+    """
+
+    def __init__(self, cassette_path, host="127.0.0.1", port=0, latency=0.0):
+        with open(cassette_path) as f:
+            bars = json.load(f).get("download", {})
+        delay = latency
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                ticker = unquote(path.rsplit("/", 1)[-1])
+                rec = bars.get(ticker) if path.startswith("/v8/finance/chart/") else None
+                if delay:
+                    time.sleep(delay)
+                if not rec:
+                    body = {"chart": {"result": None,
+                                      "error": {"code": "Not Found", "description": ticker}}}
+                    self._send(404, body)
+                    return
+                closes = [c for c in rec.get("Close", []) if c is not None]
+                highs = [v for v in rec.get("High", []) if v is not None] or closes
+                lows = [v for v in rec.get("Low", []) if v is not None] or closes
+                body = {"chart": {"error": None, "result": [{
+                    "meta": {"symbol": ticker,
+                             "regularMarketPrice": closes[-1] if closes else None,
+                             "chartPreviousClose": closes[-6] if len(closes) >= 6 else None,
+                             "fiftyTwoWeekHigh": max(highs) if highs else None,
+                             "fiftyTwoWeekLow": min(lows) if lows else None},
+                    "indicators": {"quote": [{"close": rec.get("Close", [])[-5:]}]},
+                }]}}
+                self._send(200, body)
+
+            def _send(self, code, body):
+                raw = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AGSIST quote backend tools")
+    parser.add_argument("command", choices=("serve",))
+    parser.add_argument("cassette")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every response")
+    args = parser.parse_args()
+    standin = ChartStandIn(args.cassette, port=args.port, latency=args.latency)
+    print(f"chart stand-in for {args.cassette} on {standin.url}  (Ctrl-C to stop)")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The pipeline is a set of standalone scripts that import each other by
+# module name; make them importable the same way here.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
@@ -0,0 +1,24 @@
+from datetime import date
+
+import cbot_contracts
+
+
+def test_aliases_share_a_crop_year():
+    assert cbot_contracts.check_aliases(date(2024, 1, 1), 366 * 12) is None
+
+
+def test_aliases_roll_together_with_nov_beans():
+    symbols = cbot_contracts.active_symbols(date(2026, 10, 1))
+    assert (symbols["corn-dec"], symbols["beans-nov"]) == ("ZCZ26.CBT", "ZSX26.CBT")
+
+    symbols = cbot_contracts.active_symbols(date(2026, 10, 17))
+    assert (symbols["corn-dec"], symbols["beans-nov"]) == ("ZCZ27.CBT", "ZSX27.CBT")
+    assert symbols["corn-dec26"] == "ZCZ26.CBT"   # old crop stays on the curve
+
+
+def test_alias_history_lives_under_the_dated_contract():
+    today = date(2026, 10, 17)
+    keys = cbot_contracts.alias_history_keys(today)
+    assert keys == {"corn-dec": "corn-dec27", "beans-nov": "beans-nov27"}
+    # the curve skips the aliased contract, so no two keys share a series
+    assert not set(keys.values()) & set(cbot_contracts.active_symbols(today))
@@ -0,0 +1,23 @@
+import copy
+import random
+
+import fetch_markets
+
+
+def market(platform, ticker, title):
+    return {"platform": platform, "ticker": ticker, "title": title,
+            "tier": 2, "volume_24h": 1000, "relevance": 60}
+
+
+def test_cross_platform_merge_ignores_input_order():
+    markets = [market("Kalshi", "KXFED-26JUN", "Will the Fed cut rates in June 2026?"),
+               market("Polymarket", "111", "Fed cut rates in June 2026?"),
+               market("Polymarket", "222", "Fed cuts rates in June 2026")]
+    outcomes = set()
+    for seed in range(20):
+        shuffled = copy.deepcopy(markets)
+        random.Random(seed).shuffle(shuffled)
+        merged = fetch_markets.merge_cross_platform(shuffled)
+        outcomes.add(tuple(sorted((m["platform"], m["ticker"], tuple(o["ticker"] for o in m.get("also_on", [])))
+                                  for m in merged)))
+    assert outcomes == {(("Kalshi", "KXFED-26JUN", ("111",)), ("Polymarket", "222", ()))}
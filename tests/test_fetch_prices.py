@@ -0,0 +1,77 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+import fetch_prices
+import price_history
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    """A throwaway history store with SPIKE_WINDOW flat bars for corn and beans."""
+    monkeypatch.setattr(price_history, "HISTORY_DIR", str(tmp_path))
+    start = date(2026, 1, 5)
+    for key in ("corn", "beans"):
+        for i in range(fetch_prices.SPIKE_WINDOW):
+            price_history.append_snapshot(key, 420 + i % 3, (start + timedelta(days=i)).isoformat())
+    return tmp_path
+
+
+def quote(key, ticker, close, prev):
+    return fetch_prices._finish_quote(key, ticker, close, prev, None, None)
+
+
+def test_spike_quarantined_then_confirmed(history):
+    fresh = {"corn":  quote("corn", "ZC=F", 421.5, 420.25),
+             "beans": quote("beans", "ZS=F", 4215.0, 421.0)}
+    held = fetch_prices.screen_spikes(fresh)
+    assert set(held) == {"beans"}
+    assert "corn" in fresh and "beans" not in fresh
+    assert held["beans"]["prev"] == 421.0
+
+    # next run: the quarantine comes back out of prices.json
+    fresh = {"beans": quote("beans", "ZS=F", 4216.0, 4215.0)}
+    assert fetch_prices.screen_spikes(fresh, json.loads(json.dumps(held))) == {}
+    assert "beans" in fresh
+
+
+def test_pending_quarantine_survives_skipped_runs(history):
+    fresh = {"beans": quote("beans", "ZS=F", 4215.0, 421.0)}
+    held = fetch_prices.screen_spikes(fresh)
+
+    # beans not due this run: only corn is fetched
+    fresh = {"corn": quote("corn", "ZC=F", 421.5, 420.25)}
+    held = fetch_prices.screen_spikes(fresh, held)
+    assert set(held) == {"beans"}
+
+    fresh = {"beans": quote("beans", "ZS=F", 4216.0, 4215.0)}
+    assert fetch_prices.screen_spikes(fresh, held) == {}
+    assert "beans" in fresh
+
+
+def test_quarantine_for_retired_symbol_is_dropped(history):
+    held = {"corn-dec19": {"close": 1.0, "prev": 1.0, "median": 1.0, "z": 9.0}}
+    assert fetch_prices.screen_spikes({}, held) == {}
+
+
+def test_alias_roll_reads_the_new_contracts_own_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_history, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(fetch_prices, "HISTORY_KEYS", {"corn-dec": "corn-dec27"})
+    start = date(2026, 9, 1)
+    for i in range(fetch_prices.SPIKE_WINDOW):
+        day = (start + timedelta(days=i)).isoformat()
+        price_history.append_snapshot("corn-dec", 420 + i % 3, day)     # old alias-keyed file (Dec '26)
+        price_history.append_snapshot("corn-dec27", 460 + i % 3, day)   # next year, on the curve
+
+    class Monday(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 10, 19, 15, 0, tzinfo=timezone.utc)
+
+    monkeypatch.setattr(fetch_prices, "datetime", Monday)
+    fresh = {"corn-dec": quote("corn-dec", "ZCZ27.CBT", 463.5, 460.5)}
+    assert fetch_prices.screen_spikes(fresh) == {}
+    fetch_prices.append_history(fresh)
+    assert price_history.tail("corn-dec27", 1)[0] == ("2026-10-19", 463.5, 463.5, 463.5, 463.5)
+    assert price_history.tail("corn-dec", 1)[0][0] == "2026-09-20"